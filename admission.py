@@ -0,0 +1,178 @@
+"""
+Dot App - Admission Control
+Per-user, per-route-class concurrency limits with a short wait queue.
+
+Every API request is classed (chat, writes, exports, reads) and must take
+a slot before it runs: at most PER_USER of a class per user, and at most
+CAPACITY of a class in this worker. Requests over the limit wait briefly
+in a bounded queue; anything that can't get in is turned away fast with
+Retry-After - 429 when the user is over their own limit, 503 when the
+worker is full - instead of tying up upstream calls.
+
+Counters are per worker process; /metrics reports them with a pid label.
+"""
+
+import os
+import time
+import threading
+
+# ==================== 
+# Configuration
+# ==================== 
+
+def _limit(cls, kind, default):
+    return int(os.environ.get(f'ADMIT_{cls.upper()}_{kind}', default))
+
+
+# class -> per-user in-flight, worker in-flight, max queued
+LIMITS = {
+    cls: {
+        'per_user': _limit(cls, 'PER_USER', per_user),
+        'capacity': _limit(cls, 'CAPACITY', capacity),
+        'queue': _limit(cls, 'QUEUE', queue),
+    }
+    for cls, per_user, capacity, queue in (
+        ('chat', 1, 10, 10),
+        ('writes', 2, 20, 20),
+        ('exports', 1, 2, 2),
+        ('reads', 6, 60, 40),
+    )
+}
+
+QUEUE_TIMEOUT = float(os.environ.get('ADMIT_QUEUE_TIMEOUT', 2))  # Seconds a request may wait for a slot
+RETRY_AFTER = {'user': 1, 'busy': 5}  # Seconds, by rejection reason
+
+# Never limited: static files, health checks, SSE, Airtable pings, metrics
+EXEMPT_ENDPOINTS = {
+    'index', 'serve_static', 'static', 'dist_asset', 'service_worker', 'health', 'health_ready',
+    'events_stream', 'airtable_webhook', 'metrics',
+}
+
+
+def classify(endpoint, method):
+    """Route class for a request, or None if it isn't limited."""
+    if not endpoint or endpoint in EXEMPT_ENDPOINTS:
+        return None
+    if endpoint == 'chat':
+        return 'chat'
+    if endpoint.startswith('export_'):
+        return 'exports'
+    if method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+        return 'writes'
+    return 'reads'
+
+
+# ==================== 
+# Slots
+# ==================== 
+
+class Rejected(Exception):
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason  # 'user' or 'busy'
+        self.retry_after = RETRY_AFTER[reason]
+
+
+_cond = threading.Condition()
+_inflight = {cls: 0 for cls in LIMITS}
+_user_inflight = {}   # (cls, user) -> count
+_waiting = {cls: 0 for cls in LIMITS}
+_user_waiting = {}    # (cls, user) -> count
+_admitted = {cls: 0 for cls in LIMITS}
+_rejected = {(cls, reason): 0 for cls in LIMITS for reason in RETRY_AFTER}
+
+
+def _bump(counts, key, delta):
+    value = counts.get(key, 0) + delta
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+def acquire(cls, user):
+    """
+    Take a slot for (cls, user), waiting up to QUEUE_TIMEOUT.
+    Returns a token for release(); raises Rejected.
+    """
+    limits = LIMITS[cls]
+    key = (cls, user)
+
+    with _cond:
+        def has_room():
+            return (_user_inflight.get(key, 0) < limits['per_user']
+                    and _inflight[cls] < limits['capacity'])
+
+        if not has_room():
+            # A user may queue at most their own limit's worth of requests
+            if _user_waiting.get(key, 0) >= limits['per_user']:
+                raise _rejection(cls, 'user')
+            if _waiting[cls] >= limits['queue']:
+                raise _rejection(cls, 'busy')
+
+            _waiting[cls] += 1
+            _bump(_user_waiting, key, 1)
+            deadline = time.monotonic() + QUEUE_TIMEOUT
+            try:
+                while not has_room():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        user_bound = _user_inflight.get(key, 0) >= limits['per_user']
+                        raise _rejection(cls, 'user' if user_bound else 'busy')
+                    _cond.wait(remaining)
+            finally:
+                _waiting[cls] -= 1
+                _bump(_user_waiting, key, -1)
+
+        _inflight[cls] += 1
+        _bump(_user_inflight, key, 1)
+        _admitted[cls] += 1
+        return key
+
+
+def _rejection(cls, reason):
+    _rejected[(cls, reason)] += 1
+    return Rejected(reason)
+
+
+def release(token):
+    cls, _user = token
+    with _cond:
+        _inflight[cls] -= 1
+        _bump(_user_inflight, token, -1)
+        _cond.notify_all()
+
+
+# ==================== 
+# Metrics
+# ==================== 
+
+def render_metrics(gauges=()):
+    """
+    Prometheus text exposition of this worker's counters, plus any
+    (name, help, value) gauges other modules report.
+    """
+    pid = os.getpid()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            label_text = ','.join(f'{k}="{v}"' for k, v in (('pid', pid),) + labels)
+            lines.append(f'{name}{{{label_text}}} {value}')
+
+    with _cond:
+        metric('dot_admission_inflight', 'gauge', 'Requests currently running.',
+               [((('class', cls),), n) for cls, n in _inflight.items()])
+        metric('dot_admission_queue_depth', 'gauge', 'Requests waiting for a slot.',
+               [((('class', cls),), n) for cls, n in _waiting.items()])
+        metric('dot_admission_admitted_total', 'counter', 'Requests admitted.',
+               [((('class', cls),), n) for cls, n in _admitted.items()])
+        metric('dot_admission_rejected_total', 'counter', 'Requests turned away, by reason.',
+               [((('class', cls), ('reason', reason)), n) for (cls, reason), n in _rejected.items()])
+
+    for name, help_text, value in gauges:
+        metric(name, 'gauge', help_text, [((), value)])
+
+    return '\n'.join(lines) + '\n'
@@ -15,14 +15,70 @@ import re
 
 AIRTABLE_API_KEY = os.environ.get('AIRTABLE_API_KEY')
 AIRTABLE_BASE_ID = os.environ.get('AIRTABLE_BASE_ID', 'app8CI7NAZqhQ4G1Y')
+AIRTABLE_API_URL = os.environ.get('AIRTABLE_API_URL', 'https://api.airtable.com')
+AIRTABLE_TIMEOUT = int(os.environ.get('AIRTABLE_TIMEOUT', 15))
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 10))
+
+HISTORY_PREVIEW = 3    # Update history entries included on list views
+PAGE_SIZE = 20         # Default page for cursor-paginated endpoints
+MAX_PAGE_SIZE = 100    # Airtable's own maximum pageSize
+UPDATES_CREATED_FIELD = os.environ.get('AIRTABLE_UPDATES_CREATED_FIELD', 'Created')  # Created-time field on Updates
 
 HEADERS = {
     'Authorization': f'Bearer {AIRTABLE_API_KEY}',
     'Content-Type': 'application/json'
 }
 
+# Shared session - keeps TLS connections to Airtable open between calls.
+# Under gevent workers the pool is shared by all greenlets in a worker.
+http = requests.Session()
+http.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+http.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+http.headers.update(HEADERS)
+
 def get_airtable_url(table):
-    return f'https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{table}'
+    return f'{AIRTABLE_API_URL}/v0/{AIRTABLE_BASE_ID}/{table}'
+
+
+def fetch_page(table, params=None, offset=None):
+    """
+    Fetch one page of raw records.
+    Returns: (records, next offset or None). Raises on HTTP errors.
+    """
+    params = dict(params or {})
+    if offset:
+        params['offset'] = offset
+    
+    response = http.get(get_airtable_url(table), params=params, timeout=AIRTABLE_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    
+    return data.get('records', []), data.get('offset')
+
+
+def iter_pages(table, params=None):
+    """
+    Yield raw record pages one at a time, following pagination.
+    Only one page is held in memory. Raises on HTTP errors.
+    """
+    offset = None
+    
+    while True:
+        page, offset = fetch_page(table, params, offset)
+        yield page
+        if not offset:
+            break
+
+
+def fetch_records(table, params=None):
+    """
+    Fetch every raw record from a table, following pagination.
+    Raises on HTTP errors - callers decide how to degrade.
+    """
+    records = []
+    for page in iter_pages(table, params):
+        records.extend(page)
+    return records
 
 
 # ==================== 
@@ -68,10 +124,13 @@ def extract_client_code(job_number):
 # Transform Functions
 # ==================== 
 
-def transform_project(record):
+def transform_project(record, history_limit=None):
     """
     Transform Airtable record to universal schema format.
     Matches Hub's transform_project exactly.
+    
+    history_limit keeps only the latest N updateHistory entries (list
+    views); historyCount always has the full count.
     """
     fields = record.get('fields', {})
     job_number = fields.get('Job Number', '')
@@ -101,6 +160,10 @@ def transform_project(record):
     else:
         update_history = []
     
+    history_count = len(update_history)
+    if history_limit is not None:
+        update_history = update_history[-history_limit:] if history_limit else []
+    
     return {
         # Identity
         'jobNumber': job_number,
@@ -122,6 +185,7 @@ def transform_project(record):
         'theStory': fields.get('The Story', ''),
         'update': latest_update,
         'updateHistory': update_history,
+        'historyCount': history_count,
         'projectOwner': fields.get('Project Owner', ''),
         
         # Links
@@ -133,44 +197,47 @@ def transform_project(record):
 # Clients
 # ==================== 
 
-def get_clients():
+def build_clients(records):
     """
-    Get all clients, split into main (retainer) vs other.
+    Split raw Clients records into main (retainer) vs other.
     Main clients: Monthly Committed > 0
     """
-    try:
-        url = get_airtable_url('Clients')
-        response = requests.get(url, headers=HEADERS)
-        response.raise_for_status()
+    main = []
+    other = []
+    
+    for record in records:
+        fields = record.get('fields', {})
+        code = fields.get('Client code', '')
+        name = fields.get('Clients', '')
         
-        main = []
-        other = []
+        if not code:
+            continue
         
-        for record in response.json().get('records', []):
-            fields = record.get('fields', {})
-            code = fields.get('Client code', '')
-            name = fields.get('Clients', '')
-            
-            if not code:
-                continue
-            
-            # Parse Monthly Committed
-            monthly = fields.get('Monthly Committed', 0)
-            if isinstance(monthly, str):
-                monthly = int(monthly.replace('$', '').replace(',', '') or 0)
-            
-            client = {'code': code, 'name': name}
-            
-            if monthly > 0:
-                main.append(client)
-            else:
-                other.append(client)
+        # Parse Monthly Committed
+        monthly = fields.get('Monthly Committed', 0)
+        if isinstance(monthly, str):
+            monthly = int(monthly.replace('$', '').replace(',', '') or 0)
         
-        # Sort alphabetically by name
-        main.sort(key=lambda x: x['name'])
-        other.sort(key=lambda x: x['name'])
+        client = {'code': code, 'name': name}
         
-        return {'main': main, 'other': other}
+        if monthly > 0:
+            main.append(client)
+        else:
+            other.append(client)
+    
+    # Sort alphabetically by name
+    main.sort(key=lambda x: x['name'])
+    other.sort(key=lambda x: x['name'])
+    
+    return {'main': main, 'other': other}
+
+
+def get_clients():
+    """
+    Get all clients, split into main (retainer) vs other.
+    """
+    try:
+        return build_clients(fetch_records('Clients'))
     
     except Exception as e:
         print(f'[Airtable] Error fetching clients: {e}')
@@ -181,6 +248,26 @@ def get_clients():
 # Jobs
 # ==================== 
 
+ACTIVE_STATUSES = ['Incoming', 'In Progress', 'On Hold']
+
+
+def build_status_formula(status_filter='active'):
+    """Airtable formula matching 'active' (default), 'completed', 'archived' or 'all' jobs."""
+    if status_filter == 'active':
+        statuses = ACTIVE_STATUSES
+    elif status_filter == 'completed':
+        statuses = ['Completed']
+    elif status_filter == 'archived':
+        statuses = ['Archived']
+    elif status_filter == 'all':
+        statuses = ACTIVE_STATUSES + ['Completed', 'Archived']
+    else:
+        statuses = ACTIVE_STATUSES
+    
+    formula_parts = [f"{{Status}} = '{s}'" for s in statuses]
+    return f"OR({', '.join(formula_parts)})"
+
+
 def get_all_jobs(status_filter='active', client_filter=None):
     """
     Get jobs in universal schema format.
@@ -190,50 +277,85 @@ def get_all_jobs(status_filter='active', client_filter=None):
         client_filter: filter by client code (e.g., 'SKY')
     """
     try:
-        url = get_airtable_url('Projects')
-        
-        # Build status filter
-        if status_filter == 'active':
-            statuses = ['Incoming', 'In Progress', 'On Hold']
-        elif status_filter == 'completed':
-            statuses = ['Completed']
-        elif status_filter == 'all':
-            statuses = ['Incoming', 'In Progress', 'On Hold', 'Completed', 'Archived']
-        else:
-            statuses = ['Incoming', 'In Progress', 'On Hold']
-        
-        formula_parts = [f"{{Status}} = '{s}'" for s in statuses]
-        filter_formula = f"OR({', '.join(formula_parts)})"
+        filter_formula = build_status_formula(status_filter)
         
         # Add client filter if provided
         if client_filter:
             filter_formula = f"AND({filter_formula}, FIND('{client_filter}', {{Job Number}})=1)"
         
-        params = {'filterByFormula': filter_formula}
+        records = fetch_records('Projects', {'filterByFormula': filter_formula})
+        return [transform_project(record) for record in records]
+    
+    except Exception as e:
+        print(f'[Airtable] Error fetching jobs: {e}')
+        return []
+
+
+def iter_jobs(status_filter='all', client_filter=None):
+    """
+    Yield jobs (universal schema) page by page as Airtable returns them.
+    For exports - raises on HTTP errors, which may be mid-stream.
+    """
+    filter_formula = build_status_formula(status_filter)
+    if client_filter:
+        filter_formula = f"AND({filter_formula}, FIND('{client_filter}', {{Job Number}})=1)"
+    
+    params = {'filterByFormula': filter_formula, 'pageSize': MAX_PAGE_SIZE}
+    for page in iter_pages('Projects', params):
+        for record in page:
+            yield transform_project(record)
+
+
+# Frontend sort keys -> Airtable fields
+JOB_SORT_FIELDS = {
+    'jobNumber': 'Job Number',
+    'jobName': 'Project Name',
+    'updateDue': 'Update Due',
+}
+
+
+def get_jobs_page(status_filter='completed', client_filter=None, cursor=None,
+                  limit=PAGE_SIZE, sort='-updateDue'):
+    """
+    One page of jobs, sorted by Airtable - cost doesn't grow with the archive.
+    
+    Args:
+        status_filter: 'completed' (default), 'archived', 'active', 'all'
+        client_filter: client code prefix (e.g., 'SKY')
+        cursor: nextCursor from the previous page
+        limit: page size (max 100)
+        sort: a JOB_SORT_FIELDS key, '-' prefix for descending
+    
+    Returns:
+        {'jobs': [...], 'nextCursor': '...' or None}
+    """
+    try:
+        filter_formula = build_status_formula(status_filter)
+        if client_filter:
+            filter_formula = f"AND({filter_formula}, FIND('{client_filter}', {{Job Number}})=1)"
         
-        all_jobs = []
-        offset = None
+        direction = 'desc' if sort.startswith('-') else 'asc'
+        sort_field = JOB_SORT_FIELDS.get(sort.lstrip('-'), 'Update Due')
         
-        while True:
-            if offset:
-                params['offset'] = offset
-            
-            response = requests.get(url, headers=HEADERS, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            for record in data.get('records', []):
-                all_jobs.append(transform_project(record))
-            
-            offset = data.get('offset')
-            if not offset:
-                break
+        params = {
+            'filterByFormula': filter_formula,
+            'pageSize': max(1, min(int(limit), MAX_PAGE_SIZE)),
+            'sort[0][field]': sort_field,
+            'sort[0][direction]': direction,
+            # Tie-break so pages are stable
+            'sort[1][field]': 'Job Number',
+            'sort[1][direction]': 'asc',
+        }
         
-        return all_jobs
+        records, offset = fetch_page('Projects', params, cursor)
+        return {
+            'jobs': [transform_project(record, HISTORY_PREVIEW) for record in records],
+            'nextCursor': offset
+        }
     
     except Exception as e:
-        print(f'[Airtable] Error fetching jobs: {e}')
-        return []
+        print(f'[Airtable] Error fetching {status_filter} jobs page: {e}')
+        return {'jobs': [], 'nextCursor': None, 'error': str(e)}
 
 
 def get_jobs_for_client(client_code):
@@ -250,7 +372,7 @@ def get_job(job_number):
             'maxRecords': 1
         }
         
-        response = requests.get(url, headers=HEADERS, params=params)
+        response = http.get(url, params=params, timeout=AIRTABLE_TIMEOUT)
         response.raise_for_status()
         
         records = response.json().get('records', [])
@@ -273,7 +395,7 @@ def get_job_record_id(job_number):
             'maxRecords': 1
         }
         
-        response = requests.get(url, headers=HEADERS, params=params)
+        response = http.get(url, params=params, timeout=AIRTABLE_TIMEOUT)
         response.raise_for_status()
         
         records = response.json().get('records', [])
@@ -386,53 +508,60 @@ def get_todo_jobs():
         return {'today': [], 'next': []}
 
 
-def get_meetings():
+def build_meetings(records, today_date=None, next_day=None):
     """
-    Get meetings for today and next workday.
+    Bucket raw Meetings records into today and next workday.
+    Pass the dates to skip recomputing them.
     Returns: {'today': [...], 'next': [...]}
     """
-    try:
-        url = get_airtable_url('Meetings')
-        response = requests.get(url, headers=HEADERS)
-        response.raise_for_status()
-        
+    if today_date is None:
         today_date = get_nz_today()
+    if next_day is None:
         next_day, _ = get_next_workday()
+    
+    today_meetings = []
+    next_meetings = []
+    
+    for record in records:
+        fields = record.get('fields', {})
+        
+        start_str = fields.get('Start', '')
+        end_str = fields.get('End', '')
+        meeting_date, start_time = parse_meeting_datetime(start_str)
+        _, end_time = parse_meeting_datetime(end_str)
+        
+        if not meeting_date:
+            continue
+        
+        meeting = {
+            'id': record.get('id'),
+            'title': fields.get('Title', ''),
+            'startTime': start_time,
+            'endTime': end_time,
+            'start': start_str,
+            'location': fields.get('Location', ''),
+            'whose': fields.get('Whose meeting', ''),
+            'attendees': fields.get("Who's going", ''),
+        }
         
-        today_meetings = []
-        next_meetings = []
-        
-        for record in response.json().get('records', []):
-            fields = record.get('fields', {})
-            
-            start_str = fields.get('Start', '')
-            end_str = fields.get('End', '')
-            meeting_date, start_time = parse_meeting_datetime(start_str)
-            _, end_time = parse_meeting_datetime(end_str)
-            
-            if not meeting_date:
-                continue
-            
-            meeting = {
-                'id': record.get('id'),
-                'title': fields.get('Title', ''),
-                'startTime': start_time,
-                'endTime': end_time,
-                'start': start_str,
-                'location': fields.get('Location', ''),
-                'whose': fields.get('Whose meeting', ''),
-                'attendees': fields.get("Who's going", ''),
-            }
-            
-            if meeting_date == today_date:
-                today_meetings.append(meeting)
-            elif meeting_date == next_day:
-                next_meetings.append(meeting)
-        
-        today_meetings.sort(key=lambda x: x.get('start', ''))
-        next_meetings.sort(key=lambda x: x.get('start', ''))
-        
-        return {'today': today_meetings, 'next': next_meetings}
+        if meeting_date == today_date:
+            today_meetings.append(meeting)
+        elif meeting_date == next_day:
+            next_meetings.append(meeting)
+    
+    today_meetings.sort(key=lambda x: x.get('start', ''))
+    next_meetings.sort(key=lambda x: x.get('start', ''))
+    
+    return {'today': today_meetings, 'next': next_meetings}
+
+
+def get_meetings():
+    """
+    Get meetings for today and next workday.
+    Returns: {'today': [...], 'next': [...]}
+    """
+    try:
+        return build_meetings(fetch_records('Meetings'))
     
     except Exception as e:
         print(f'[Airtable] Error fetching meetings: {e}')
@@ -443,7 +572,7 @@ def get_meetings():
 # Updates
 # ==================== 
 
-def update_project(job_number, fields):
+def update_project(job_number, fields, record_id=None):
     """
     Update a project's fields in Airtable.
     
@@ -451,26 +580,22 @@ def update_project(job_number, fields):
         job_number: e.g. "SKY 018"
         fields: dict of frontend field names to values
             - status, stage, withClient, updateDue, liveDate, description, projectOwner
+        record_id: Airtable record ID if already known (skips the lookup)
     
     Returns:
-        {'success': True/False, 'error': '...'}
+        {'success': True/False, 'updated': [...], 'record': {...}, 'job': {...}, 'error': '...'}
+        record is the raw record from Airtable's PATCH response, job its
+        transformed form - no refetch needed to show the change.
     """
     try:
-        # Get record ID
         url = get_airtable_url('Projects')
-        params = {
-            'filterByFormula': f"{{Job Number}} = '{job_number}'",
-            'maxRecords': 1
-        }
-        response = requests.get(url, headers=HEADERS, params=params)
-        response.raise_for_status()
         
-        records = response.json().get('records', [])
-        if not records:
+        # Get record ID
+        if not record_id:
+            record_id = get_job_record_id(job_number)
+        if not record_id:
             return {'success': False, 'error': 'Job not found'}
         
-        record_id = records[0].get('id')
-        
         # Map frontend field names to Airtable field names
         field_mapping = {
             'stage': 'Stage',
@@ -496,22 +621,120 @@ def update_project(job_number, fields):
             return {'success': False, 'error': 'No valid fields to update'}
         
         # Update the record
-        update_response = requests.patch(
+        update_response = http.patch(
             f"{url}/{record_id}",
-            headers=HEADERS,
-            json={'fields': airtable_fields}
+            json={'fields': airtable_fields},
+            timeout=AIRTABLE_TIMEOUT
         )
         update_response.raise_for_status()
         
+        record = update_response.json()
         print(f'[Airtable] Updated project {job_number}: {list(airtable_fields.keys())}')
-        return {'success': True, 'updated': list(airtable_fields.keys())}
+        return {
+            'success': True,
+            'updated': list(airtable_fields.keys()),
+            'record': record,
+            'job': transform_project(record)
+        }
     
     except Exception as e:
         print(f'[Airtable] Error updating project {job_number}: {e}')
         return {'success': False, 'error': str(e)}
 
 
-def create_update_record(job_number, message, update_due=None):
+def overlay_update(record, message):
+    """
+    Copy of a Projects record with a new update rolled in, as Airtable's
+    Update Summary / Update History rollups will show it once they catch up.
+    """
+    fields = dict(record.get('fields', {}))
+    history_key = 'Update history' if 'Update history' in fields and 'Update History' not in fields else 'Update History'
+    history = fields.get(history_key) or []
+    
+    if isinstance(history, str):
+        fields[history_key] = f'{history}\n{message}' if history.strip() else message
+    else:
+        fields[history_key] = list(history) + [message]
+    fields['Update Summary'] = message
+    
+    return {**record, 'fields': fields}
+
+
+def transform_update(record):
+    """Transform an Updates record for the app."""
+    fields = record.get('fields', {})
+    return {
+        'id': record.get('id'),
+        'message': fields.get('Update', ''),
+        'updateDue': parse_airtable_date(fields.get('Update Due', '')),
+        'createdTime': record.get('createdTime', ''),
+    }
+
+
+def update_history_formula(job_number):
+    """
+    Updates linked to exactly this job. Linked records join to their primary
+    field (Job Number); wrapping both sides in ', ' stops 'SKY 01' matching 'SKY 017'.
+    """
+    return f"FIND(', {job_number}, ', ', ' & ARRAYJOIN({{Project Link}}, ', ') & ', ')"
+
+
+_updates_sortable = {'value': bool(UPDATES_CREATED_FIELD)}  # Off once Airtable says the field doesn't exist
+
+
+def is_unknown_field(error):
+    """True for Airtable's 422 UNKNOWN_FIELD_NAME (e.g. sorting on a missing field)."""
+    response = getattr(error, 'response', None)
+    if response is None or response.status_code != 422:
+        return False
+    try:
+        return response.json().get('error', {}).get('type') == 'UNKNOWN_FIELD_NAME'
+    except ValueError:
+        return False
+
+
+def get_update_history(job_number, cursor=None, limit=PAGE_SIZE):
+    """
+    One page of a job's Updates records, oldest first (by the
+    UPDATES_CREATED_FIELD created-time field). If the base has no such
+    field, pages come back in Airtable's default order instead.
+    
+    Returns:
+        {'updates': [...], 'nextCursor': '...' or None}
+    """
+    try:
+        params = {
+            'filterByFormula': update_history_formula(job_number),
+            'pageSize': max(1, min(int(limit), MAX_PAGE_SIZE)),
+        }
+        sorted_params = dict(params, **{
+            'sort[0][field]': UPDATES_CREATED_FIELD,
+            'sort[0][direction]': 'asc',
+        })
+        
+        if _updates_sortable['value']:
+            try:
+                records, offset = fetch_page('Updates', sorted_params, cursor)
+            except requests.HTTPError as e:
+                if not is_unknown_field(e):
+                    raise
+                print(f"[Airtable] Updates has no '{UPDATES_CREATED_FIELD}' field - history unsorted")
+                _updates_sortable['value'] = False
+        
+        if not _updates_sortable['value']:
+            records, offset = fetch_page('Updates', params, cursor)
+        
+        return {
+            'updates': [transform_update(record) for record in records],
+            'nextCursor': offset
+        }
+    
+    except Exception as e:
+        print(f'[Airtable] Error fetching history for {job_number}: {e}')
+        return {'updates': [], 'nextCursor': None, 'error': str(e)}
+
+
+def create_update_record(job_number, message, update_due=None, record_id=None):
     """
     Create an Updates table record for a job.
     
@@ -519,13 +742,15 @@ def create_update_record(job_number, message, update_due=None):
         job_number: e.g. "SKY 018"
         message: The update text
         update_due: Optional next update due date (YYYY-MM-DD)
+        record_id: Project's Airtable record ID if already known (skips the lookup)
     
     Returns:
-        {'success': True/False, 'record_id': '...', 'error': '...'}
+        {'success': True/False, 'record_id': '...', 'update': {...}, 'error': '...'}
     """
     try:
         # Get project record ID for linking
-        record_id = get_job_record_id(job_number)
+        if not record_id:
+            record_id = get_job_record_id(job_number)
         if not record_id:
             return {'success': False, 'error': 'Job not found'}
         
@@ -539,16 +764,16 @@ def create_update_record(job_number, message, update_due=None):
         if update_due:
             fields['Update Due'] = update_due
         
-        response = requests.post(
+        response = http.post(
             url,
-            headers=HEADERS,
-            json={'fields': fields}
+            json={'fields': fields},
+            timeout=AIRTABLE_TIMEOUT
         )
         response.raise_for_status()
         
         new_record = response.json()
         print(f'[Airtable] Created update record for {job_number}')
-        return {'success': True, 'record_id': new_record.get('id')}
+        return {'success': True, 'record_id': new_record.get('id'), 'update': transform_update(new_record)}
     
     except Exception as e:
         print(f'[Airtable] Error creating update record: {e}')
@@ -559,66 +784,55 @@ def create_update_record(job_number, message, update_due=None):
 # Tracker
 # ==================== 
 
+def first_value(value):
+    """Lookup fields may come back as lists - take the first entry."""
+    if isinstance(value, list):
+        return value[0] if value else ''
+    return value
+
+
+def transform_tracker_record(record, client_code=None):
+    """
+    Transform a Tracker record to the spend schema.
+    Returns None for zero-spend records (skipped everywhere).
+    """
+    fields = record.get('fields', {})
+    
+    spend = fields.get('Spend', 0)
+    if isinstance(spend, str):
+        spend = float(spend.replace('$', '').replace(',', '') or 0)
+    
+    # Skip zero spend records
+    if spend == 0:
+        return None
+    
+    return {
+        'id': record.get('id'),
+        'client': client_code or first_value(fields.get('Client Code', '')),
+        'jobNumber': first_value(fields.get('Job Number', '')),
+        'projectName': first_value(fields.get('Project Name', '')),
+        'owner': first_value(fields.get('Owner', '')),
+        'description': fields.get('Tracker notes', ''),
+        'spend': spend,
+        'month': fields.get('Month', ''),
+        'spendType': fields.get('Spend type', 'Project budget'),
+        'ballpark': bool(fields.get('Ballpark', False)),
+    }
+
+
 def get_tracker_for_client(client_code):
     """
     Get budget/spend data for a client.
     Returns spend records for the client.
     """
     try:
-        url = get_airtable_url('Tracker')
-        params = {'filterByFormula': f"{{Client Code}} = '{client_code}'"}
+        records = fetch_records('Tracker', {'filterByFormula': f"{{Client Code}} = '{client_code}'"})
         
         all_records = []
-        offset = None
-        
-        while True:
-            if offset:
-                params['offset'] = offset
-            
-            response = requests.get(url, headers=HEADERS, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            for record in data.get('records', []):
-                fields = record.get('fields', {})
-                
-                # Handle lookup fields that may return as lists
-                job_number = fields.get('Job Number', '')
-                if isinstance(job_number, list):
-                    job_number = job_number[0] if job_number else ''
-                
-                project_name = fields.get('Project Name', '')
-                if isinstance(project_name, list):
-                    project_name = project_name[0] if project_name else ''
-                
-                owner = fields.get('Owner', '')
-                if isinstance(owner, list):
-                    owner = owner[0] if owner else ''
-                
-                spend = fields.get('Spend', 0)
-                if isinstance(spend, str):
-                    spend = float(spend.replace('$', '').replace(',', '') or 0)
-                
-                # Skip zero spend records
-                if spend == 0:
-                    continue
-                
-                all_records.append({
-                    'id': record.get('id'),
-                    'client': client_code,
-                    'jobNumber': job_number,
-                    'projectName': project_name,
-                    'owner': owner,
-                    'description': fields.get('Tracker notes', ''),
-                    'spend': spend,
-                    'month': fields.get('Month', ''),
-                    'spendType': fields.get('Spend type', 'Project budget'),
-                    'ballpark': bool(fields.get('Ballpark', False)),
-                })
-            
-            offset = data.get('offset')
-            if not offset:
-                break
+        for record in records:
+            row = transform_tracker_record(record, client_code)
+            if row:
+                all_records.append(row)
         
         return all_records
     
@@ -627,47 +841,67 @@ def get_tracker_for_client(client_code):
         return []
 
 
+def iter_tracker(client_code=None):
+    """
+    Yield spend rows page by page, for one client or all of them.
+    For exports - raises on HTTP errors, which may be mid-stream.
+    """
+    params = {'pageSize': MAX_PAGE_SIZE}
+    if client_code:
+        params['filterByFormula'] = f"{{Client Code}} = '{client_code}'"
+    
+    for page in iter_pages('Tracker', params):
+        for record in page:
+            row = transform_tracker_record(record, client_code)
+            if row:
+                yield row
+
+
+def parse_currency(val):
+    if isinstance(val, (int, float)):
+        return val
+    if isinstance(val, str):
+        return int(val.replace('$', '').replace(',', '') or 0)
+    return 0
+
+
+def build_tracker_clients(records):
+    """
+    Clients with budget info (for tracker view), from raw Clients records.
+    Only returns clients with Monthly Committed > 0.
+    """
+    clients = []
+    for record in records:
+        fields = record.get('fields', {})
+        
+        monthly = parse_currency(fields.get('Monthly Committed', 0))
+        if monthly > 0:
+            rollover = fields.get('Rollover', 0)
+            if isinstance(rollover, (int, float)):
+                rollover = max(0, rollover)
+            else:
+                rollover = 0
+            
+            clients.append({
+                'code': fields.get('Client code', ''),
+                'name': fields.get('Clients', ''),
+                'committed': monthly,
+                'rollover': rollover,
+                'rolloverUseIn': 'JAN-MAR' if rollover > 0 else '',
+                'yearEnd': fields.get('Year end', ''),
+                'currentQuarter': fields.get('Current Quarter', '')
+            })
+    
+    clients.sort(key=lambda x: x['name'])
+    return clients
+
+
 def get_tracker_clients():
     """
     Get clients with budget info (for tracker view).
-    Only returns clients with Monthly Committed > 0.
     """
     try:
-        url = get_airtable_url('Clients')
-        response = requests.get(url, headers=HEADERS)
-        response.raise_for_status()
-        
-        def parse_currency(val):
-            if isinstance(val, (int, float)):
-                return val
-            if isinstance(val, str):
-                return int(val.replace('$', '').replace(',', '') or 0)
-            return 0
-        
-        clients = []
-        for record in response.json().get('records', []):
-            fields = record.get('fields', {})
-            
-            monthly = parse_currency(fields.get('Monthly Committed', 0))
-            if monthly > 0:
-                rollover = fields.get('Rollover', 0)
-                if isinstance(rollover, (int, float)):
-                    rollover = max(0, rollover)
-                else:
-                    rollover = 0
-                
-                clients.append({
-                    'code': fields.get('Client code', ''),
-                    'name': fields.get('Clients', ''),
-                    'committed': monthly,
-                    'rollover': rollover,
-                    'rolloverUseIn': 'JAN-MAR' if rollover > 0 else '',
-                    'yearEnd': fields.get('Year end', ''),
-                    'currentQuarter': fields.get('Current Quarter', '')
-                })
-        
-        clients.sort(key=lambda x: x['name'])
-        return clients
+        return build_tracker_clients(fetch_records('Clients'))
     
     except Exception as e:
         print(f'[Airtable] Error fetching tracker clients: {e}')
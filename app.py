@@ -4,15 +4,32 @@ Mobile-first web app for Hunch team.
 Mirrors Hub's patterns for consistency.
 """
 
-from flask import Flask, request, jsonify, send_from_directory, session
+from flask import Flask, Response, request, jsonify, send_from_directory, session, stream_with_context, g
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
+import json
 import requests
+from datetime import datetime
+
+import admission
+import airtable
+import assets
+import cache
+import chat_sessions
+import events
+import recorder
+import search
+import webhooks
 
 app = Flask(__name__, static_folder='static')
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-me')
 CORS(app)
 
+# Behind the platform router - take the client address from X-Forwarded-For
+# so per-client limits (admission) don't lump everyone under the router's IP
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.environ.get('PROXY_HOPS', 1)), x_proto=1)
+
 # ==================== 
 # Configuration
 # ==================== 
@@ -20,13 +37,65 @@ CORS(app)
 BRAIN_URL = os.environ.get('BRAIN_URL', 'https://dot-traffic-2.up.railway.app')
 PROXY_URL = os.environ.get('PROXY_URL', 'https://dot-proxy.up.railway.app')
 
+# Pooled connections to Brain / Teams proxy (shared by greenlets in a worker)
+upstream = requests.Session()
+for prefix in ('https://', 'http://'):
+    upstream.mount(prefix, requests.adapters.HTTPAdapter(
+        pool_maxsize=int(os.environ.get('HTTP_POOL_SIZE', 10))
+    ))
+
+# Opt-in traffic capture (RECORD_REQUESTS) - installed first so it times admission too
+recorder.install(app, airtable.http, upstream)
+
+# ==================== 
+# Admission Control
+# ==================== 
+
+@app.before_request
+def admit():
+    """Take a per-user slot for this route class, or turn the request away fast."""
+    cls = admission.classify(request.endpoint, request.method)
+    if not cls:
+        return None
+    
+    user = session.get('user') or f'anon:{request.remote_addr}'
+    try:
+        g.admission = admission.acquire(cls, user)
+    except admission.Rejected as e:
+        print(f'[App] Rejected {request.method} {request.path} for {user}: {e.reason}')
+        response = jsonify({
+            'success': False,
+            'error': 'Too many requests' if e.reason == 'user' else 'Server busy'
+        })
+        response.status_code = 429 if e.reason == 'user' else 503
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+    return None
+
+@app.teardown_request
+def release_admission(exc):
+    # Streamed responses (exports) tear down when the stream ends
+    token = g.pop('admission', None)
+    if token:
+        admission.release(token)
+
 # ==================== 
 # Static Files
 # ==================== 
 
 @app.route('/')
 def index():
-    return send_from_directory('static', 'index.html')
+    return assets.send_shell()
+
+@app.route('/static/dist/<path:filename>')
+def dist_asset(filename):
+    """Fingerprinted build output (tools/build_assets.py) - cached forever."""
+    return assets.send_dist(filename)
+
+@app.route('/sw.js')
+def service_worker():
+    response = assets.send_service_worker()
+    return response if response else ('', 404)
 
 # ==================== 
 # Auth Routes
@@ -66,8 +135,7 @@ def logout():
 @app.route('/api/clients')
 def get_clients():
     """List clients (main vs other based on retainer)"""
-    from airtable import get_clients as fetch_clients
-    clients = fetch_clients()
+    clients = cache.get_clients()
     return jsonify(clients)
 
 # ==================== 
@@ -76,45 +144,126 @@ def get_clients():
 
 @app.route('/api/jobs')
 def get_jobs():
-    """Get jobs - optionally filtered by client"""
+    """
+    Get jobs - optionally filtered by client.
+    Active jobs (default) come back as a list from the cache.
+    ?status=completed|archived|all returns one sorted page from Airtable:
+    {'jobs': [...], 'nextCursor': ...} - pass cursor= for the next one.
+    """
     client = request.args.get('client', '')
+    status = request.args.get('status', 'active')
     
-    from airtable import get_jobs_for_client, get_all_jobs
+    if status != 'active':
+        if status not in ('completed', 'archived', 'all'):
+            return jsonify({'error': 'Unknown status'}), 400
+        
+        try:
+            limit = int(request.args.get('limit', airtable.PAGE_SIZE))
+        except ValueError:
+            return jsonify({'error': 'limit must be a number'}), 400
+        
+        page = airtable.get_jobs_page(
+            status_filter=status,
+            client_filter=client or None,
+            cursor=request.args.get('cursor') or None,
+            limit=limit,
+            sort=request.args.get('sort', '-updateDue')
+        )
+        return jsonify(page), 502 if page.get('error') else 200
     
     if client:
-        jobs = get_jobs_for_client(client)
+        jobs = cache.get_jobs_for_client(client)
     else:
-        jobs = get_all_jobs()
+        jobs = cache.get_active_jobs()
     
     return jsonify(jobs)
 
 @app.route('/api/jobs/all')
 def get_all_jobs_route():
     """Get all active jobs (for Ask Dot context)"""
-    from airtable import get_all_jobs
-    jobs = get_all_jobs()
+    jobs = cache.get_active_jobs()
     return jsonify(jobs)
 
+@app.route('/api/jobs/search')
+def search_jobs():
+    """
+    Search/filter active jobs from the in-memory index.
+    Query: q, status, stage, owner, client, withClient (true/false),
+    dueBefore (YYYY-MM-DD), cursor, limit
+    """
+    with_client = request.args.get('withClient', '').lower()
+    if with_client in ('true', '1', 'yes'):
+        with_client = True
+    elif with_client in ('false', '0', 'no'):
+        with_client = False
+    else:
+        with_client = None
+    
+    due_before = request.args.get('dueBefore', '')
+    if due_before:
+        try:
+            due_before = datetime.strptime(due_before, '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            return jsonify({'error': 'dueBefore must be YYYY-MM-DD'}), 400
+    
+    try:
+        limit = int(request.args.get('limit', search.DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    
+    cursor = request.args.get('cursor', '')
+    if cursor and search.decode_cursor(cursor) is None:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    results = cache.get_job_index().search(
+        q=request.args.get('q', ''),
+        status=request.args.get('status', ''),
+        stage=request.args.get('stage', ''),
+        owner=request.args.get('owner', ''),
+        client=request.args.get('client', ''),
+        with_client=with_client,
+        due_before=due_before,
+        cursor=cursor,
+        limit=limit
+    )
+    return jsonify(results)
+
 @app.route('/api/job/<job_number>')
 def get_job(job_number):
-    """Get a single job by number"""
-    from airtable import get_job as fetch_job
-    job = fetch_job(job_number)
+    """Get a single job by number (falls back to Airtable for inactive jobs)"""
+    job = cache.get_job(job_number)
+    if not job:
+        job = airtable.get_job(job_number)
     if not job:
         return jsonify({'error': 'Job not found'}), 404
     return jsonify(job)
 
+@app.route('/api/job/<job_number>/history')
+def get_job_history(job_number):
+    """Page through a job's Updates records (?cursor=, ?limit=)"""
+    try:
+        limit = int(request.args.get('limit', airtable.PAGE_SIZE))
+    except ValueError:
+        return jsonify({'error': 'limit must be a number'}), 400
+    
+    page = airtable.get_update_history(job_number, request.args.get('cursor') or None, limit)
+    return jsonify(page), 502 if page.get('error') else 200
+
 # ==================== 
 # To Do API
 # ==================== 
 
 @app.route('/api/todo')
 def get_todo():
-    """Get jobs and meetings for today + next workday"""
-    from airtable import get_todo_jobs, get_meetings, get_next_workday
-    jobs = get_todo_jobs()
-    meetings = get_meetings()
-    _, next_label = get_next_workday()
+    """
+    Get jobs and meetings for today + next workday.
+    Optional ?owner= (full or first name) narrows jobs to one person.
+    """
+    owner = request.args.get('owner', '')
+    
+    view = cache.get_todo_view()
+    jobs = view.lookup(owner)
+    meetings = cache.get_meetings()
     
     return jsonify({
         'today': {
@@ -122,7 +271,7 @@ def get_todo():
             'jobs': jobs.get('today', [])
         },
         'next': {
-            'label': next_label,
+            'label': view.next_label,
             'meetings': meetings.get('next', []),
             'jobs': jobs.get('next', [])
         }
@@ -135,8 +284,7 @@ def get_todo():
 @app.route('/api/tracker/clients')
 def get_tracker_clients():
     """Get clients with budget info"""
-    from airtable import get_tracker_clients as fetch_tracker_clients
-    clients = fetch_tracker_clients()
+    clients = cache.get_tracker_clients()
     return jsonify(clients)
 
 @app.route('/api/tracker')
@@ -146,10 +294,58 @@ def get_tracker():
     if not client:
         return jsonify({'error': 'Client code required'}), 400
     
-    from airtable import get_tracker_for_client
-    tracker = get_tracker_for_client(client)
+    tracker = cache.get_tracker_for_client(client)
     return jsonify(tracker)
 
+# ==================== 
+# Exports (NDJSON)
+# ==================== 
+
+def ndjson_response(rows, name):
+    """
+    Stream rows as newline-delimited JSON as they are produced.
+    A failure after the first byte can't change the status, so it is
+    reported as a final {"error": ...} line instead.
+    """
+    def generate():
+        count = 0
+        try:
+            for row in rows:
+                yield json.dumps(row, separators=(',', ':')) + '\n'
+                count += 1
+        except Exception as e:
+            print(f'[App] Export of {name} failed after {count} rows: {e}')
+            yield json.dumps({'error': 'Export interrupted', 'rows': count}) + '\n'
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-store',
+            'Content-Disposition': f'attachment; filename={name}.ndjson',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/api/export/jobs.ndjson')
+def export_jobs():
+    """
+    Every job (?status=all by default) straight from Airtable, one per line.
+    Optional ?client= prefix filter.
+    """
+    status = request.args.get('status', 'all')
+    if status not in ('active', 'completed', 'archived', 'all'):
+        return jsonify({'error': 'Unknown status'}), 400
+    
+    client = request.args.get('client', '')
+    return ndjson_response(airtable.iter_jobs(status, client or None), 'jobs')
+
+@app.route('/api/export/tracker.ndjson')
+def export_tracker():
+    """Spend rows straight from Airtable, one per line. Optional ?client=."""
+    client = request.args.get('client', '')
+    return ndjson_response(airtable.iter_tracker(client or None), f'tracker-{client}' if client else 'tracker')
+
 # ==================== 
 # Update API
 # ==================== 
@@ -160,12 +356,14 @@ def update_job(job_number):
     Update a job's fields and optionally create an Updates record.
     Also posts to Teams if there's a new message.
     
+    Returns the updated job (from Airtable's PATCH response) and the new
+    Updates record, and applies the change to the shared cache - so the
+    client doesn't need to refetch anything.
+    
     Mirrors Hub's unified update endpoint.
     """
     data = request.get_json()
     
-    from airtable import update_project, create_update_record
-    
     # Extract message for Updates table (separate from Projects fields)
     message = data.get('message', '').strip()
     update_due = data.get('updateDue')
@@ -176,23 +374,34 @@ def update_job(job_number):
         'teams_post': None
     }
     
+    # Known record ID saves a lookup read per Airtable write
+    record_id = cache.get_project_record_id(job_number)
+    record = None
+    update = None
+    
     # 1. Update Projects table
     project_fields = {k: v for k, v in data.items() if k != 'message'}
     if project_fields:
-        result = update_project(job_number, project_fields)
-        results['project_update'] = result
+        result = airtable.update_project(job_number, project_fields, record_id)
         if not result.get('success'):
             return jsonify({'success': False, 'error': result.get('error')}), 500
+        
+        # Read-your-writes: the PATCH response is the new state of the record
+        record = result.pop('record')
+        result.pop('job', None)
+        record_id = record.get('id')
+        results['project_update'] = result
     
     # 2. Create Updates record (if message provided)
     if message:
-        result = create_update_record(job_number, message, update_due)
+        result = airtable.create_update_record(job_number, message, update_due, record_id)
         results['update_record'] = result
+        update = result.get('update')
         
         # 3. Post to Teams (fire and forget)
         try:
             client_code = job_number.split(' ')[0]
-            requests.post(
+            upstream.post(
                 f"{PROXY_URL}/proxy/update",
                 json={
                     'clientCode': client_code,
@@ -207,7 +416,51 @@ def update_job(job_number):
             print(f'[App] Teams post failed (non-blocking): {e}')
             results['teams_post'] = {'success': False, 'error': str(e)}
     
-    return jsonify({'success': True, 'results': results})
+    if record is None:
+        record = cache.get_project_record(job_number)
+    
+    if record:
+        # Update Summary/History roll up from Updates inside Airtable after
+        # the PATCH - roll the new message in ourselves until the webhook
+        # or next refresh brings the real record
+        if update:
+            record = airtable.overlay_update(record, message)
+        if project_fields or update:
+            cache.apply_project(record)
+    
+    # Same shape as the list views the client keeps it alongside
+    job = cache.list_job(record) if record else None
+    
+    # 4. Push the new state to open screens (all workers)
+    events.publish('job', {
+        'jobNumber': job_number,
+        'clientCode': job_number.split(' ')[0],
+        'updated': (results['project_update'] or {}).get('updated', []),
+        'hasMessage': bool(message),
+        'job': job
+    })
+    
+    return jsonify({'success': True, 'job': job, 'update': update, 'results': results})
+
+# ==================== 
+# Live Events (SSE)
+# ==================== 
+
+@app.route('/api/events')
+def events_stream():
+    """
+    Server-Sent Events stream of job/tracker changes.
+    Needs an evented worker (see Procfile) so idle connections
+    don't pin a sync worker each.
+    """
+    return Response(
+        events.subscribe(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
 # ==================== 
 # Chat API (Ask Dot)
@@ -219,10 +472,15 @@ def chat():
     Ask Dot → Brain /hub endpoint.
     Sends jobs context + conversation history.
     Same pattern as Hub.
+
+    History is held server-side per sessionId (see chat_sessions), so
+    clients send just the new message. Clients that still post their own
+    history without a sessionId get the old behaviour.
     """
     data = request.get_json()
     message = data.get('message', '')
-    history = data.get('history', [])
+    session_id = data.get('sessionId') or ''
+    legacy = 'history' in data and not session_id
     
     if not message:
         return jsonify({'success': False, 'error': 'No message provided'}), 400
@@ -230,20 +488,30 @@ def chat():
     # Get current user from session
     sender_name = session.get('user', 'App User')
     
-    # Get all jobs for context
-    from airtable import get_all_jobs
-    jobs = get_all_jobs()
+    if legacy:
+        state = None
+        history = data.get('history', [])
+        history_summary = ''
+    else:
+        session_id = session_id or chat_sessions.new_session_id()
+        state = chat_sessions.load(session_id, sender_name)
+        history = chat_sessions.history_for_brain(state)
+        history_summary = chat_sessions.summary_for_brain(state)
+    
+    # Get all jobs for context - with full history, unlike the list views
+    jobs = cache.get_active_jobs_full()
     
     try:
         # Call Brain /hub endpoint (same as Hub does)
-        response = requests.post(
+        response = upstream.post(
             f"{BRAIN_URL}/hub",
             json={
                 'content': message,
                 'senderName': sender_name,
                 'sessionId': sender_name,
                 'jobs': jobs,
-                'history': history
+                'history': history,
+                'historySummary': history_summary
             },
             timeout=30
         )
@@ -252,6 +520,7 @@ def chat():
             print(f'[App] Brain error: {response.status_code}')
             return jsonify({
                 'success': False,
+                'sessionId': session_id or None,
                 'error': 'Brain unavailable',
                 'response': {
                     'type': 'answer',
@@ -261,8 +530,11 @@ def chat():
             })
         
         result = response.json()
+        if state is not None:
+            chat_sessions.save(session_id, sender_name, chat_sessions.add_turn(state, message, result.get('message', '')))
         return jsonify({
             'success': True,
+            'sessionId': session_id or None,
             'response': result
         })
     
@@ -270,6 +542,7 @@ def chat():
         print('[App] Brain timeout')
         return jsonify({
             'success': False,
+            'sessionId': session_id or None,
             'error': 'timeout',
             'response': {
                 'type': 'answer',
@@ -282,6 +555,7 @@ def chat():
         print(f'[App] Chat error: {e}')
         return jsonify({
             'success': False,
+            'sessionId': session_id or None,
             'error': str(e),
             'response': {
                 'type': 'answer',
@@ -290,19 +564,58 @@ def chat():
             }
         })
 
+# ==================== 
+# Airtable Webhooks
+# ==================== 
+
+@app.route('/webhooks/airtable', methods=['POST'])
+def airtable_webhook():
+    """
+    Airtable change notification → pull payloads → update cached snapshots.
+    Replies straight away; processing happens in the background.
+    """
+    body = request.get_data()
+    if not webhooks.verify_signature(body, request.headers.get('X-Airtable-Content-MAC', '')):
+        return jsonify({'success': False, 'error': 'Invalid signature'}), 401
+    
+    ping = request.get_json(silent=True) or {}
+    webhooks.notify(ping.get('webhook', {}).get('id'))
+    return jsonify({'success': True})
+
 # ==================== 
 # Health Check
 # ==================== 
 
 @app.route('/health')
 def health():
+    """Liveness - the worker is up. Readiness is reported alongside."""
     return jsonify({
         'status': 'ok',
         'service': 'dot-app',
         'version': '1.0',
-        'features': ['clients', 'jobs', 'todo', 'tracker', 'chat', 'updates']
+        'features': ['clients', 'jobs', 'todo', 'tracker', 'chat', 'updates', 'events'],
+        'readiness': cache.warm_status()
     })
 
+@app.route('/health/ready')
+def health_ready():
+    """
+    Readiness - 503 until this worker's snapshots are warm.
+    Point the platform's health check here so traffic waits for warm-up.
+    """
+    cache.warm_up()
+    status = cache.warm_status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/metrics')
+def metrics():
+    """Admission queue depth, in-flight and rejections, open streams, refresher role (Prometheus text, this worker)."""
+    gauges = [
+        ('dot_sse_subscribers', 'Open event streams.', events.subscriber_count()),
+        ('dot_cache_refresher', '1 if this worker refreshes the shared cache.', int(cache.is_refresher())),
+    ]
+    return Response(admission.render_metrics(gauges), mimetype='text/plain; version=0.0.4')
+
 # ==================== 
 # Static Files (catch-all, must be last)
 # ==================== 
@@ -316,5 +629,7 @@ def serve_static(path):
 # ==================== 
 
 if __name__ == '__main__':
+    cache.warm_up()
+    webhooks.catch_up()
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=True)
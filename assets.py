@@ -0,0 +1,109 @@
+"""
+Dot App - Static Asset Delivery
+Serves the output of tools/build_assets.py.
+
+Fingerprinted files under static/dist/ are cached forever (immutable)
+and sent precompressed (brotli, then gzip) or as WebP when the browser
+accepts it. The shell page and service worker keep stable URLs and are
+always revalidated. Without a build, the app serves static/ as before.
+"""
+
+import os
+import mimetypes
+
+from flask import request, send_from_directory
+
+# ==================== 
+# Configuration
+# ==================== 
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# (Accept-Encoding token, file suffix), best first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def is_built():
+    return os.path.isfile(os.path.join(DIST_DIR, 'index.html'))
+
+
+def accepts(header, token):
+    """True if an Accept / Accept-Encoding header lists token with q > 0."""
+    for part in (header or '').split(','):
+        name, *params = [p.strip() for p in part.split(';')]
+        if name.lower() != token:
+            continue
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    return float(param[2:]) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+# ==================== 
+# Responses
+# ==================== 
+
+def send_variant(directory, filename, cache_control):
+    """
+    Send filename from directory, swapping in a .br/.gz (or .webp) sibling
+    when one exists and the request accepts it.
+    """
+    response = None
+
+    if filename.endswith('.png') and accepts(request.headers.get('Accept'), 'image/webp') \
+            and os.path.isfile(os.path.join(directory, filename + '.webp')):
+        response = send_from_directory(directory, filename + '.webp', mimetype='image/webp')
+
+    if response is None:
+        for token, suffix in ENCODINGS:
+            if accepts(request.headers.get('Accept-Encoding'), token) \
+                    and os.path.isfile(os.path.join(directory, filename + suffix)):
+                # Type of the original file, not of the compressed sibling
+                mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                response = send_from_directory(directory, filename + suffix, mimetype=mimetype)
+                response.content_encoding = token
+                break
+
+    if response is None:
+        response = send_from_directory(directory, filename)
+
+    if os.path.isfile(os.path.join(directory, filename + '.webp')):
+        response.vary.add('Accept')
+    if os.path.isfile(os.path.join(directory, filename + '.gz')):
+        response.vary.add('Accept-Encoding')
+
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+
+def send_dist(filename):
+    """A fingerprinted asset - its name changes whenever its content does."""
+    return send_variant(DIST_DIR, filename, IMMUTABLE)
+
+
+def send_shell():
+    """index.html - the built copy (pointing at fingerprinted assets) if there is one."""
+    if is_built():
+        return send_variant(DIST_DIR, 'index.html', REVALIDATE)
+
+    response = send_from_directory(STATIC_DIR, 'index.html')
+    response.headers['Cache-Control'] = REVALIDATE
+    return response
+
+
+def send_service_worker():
+    """The built service worker, or None before a build."""
+    if not os.path.isfile(os.path.join(DIST_DIR, 'sw.js')):
+        return None
+
+    response = send_variant(DIST_DIR, 'sw.js', REVALIDATE)
+    response.headers['Service-Worker-Allowed'] = '/'
+    return response
@@ -0,0 +1,696 @@
+"""
+Dot App - Shared Snapshot Cache
+Host-wide store of Airtable snapshots shared by all gunicorn workers.
+
+Raw records live in a local SQLite file (WAL mode) keyed by snapshot
+and record ID, with a version number per snapshot. One worker at a
+time holds an flock and is the refresher; everyone else only reads.
+Each worker decodes a snapshot once per version and keeps it in
+memory, so steady-state reads are a single version lookup.
+"""
+
+import os
+import json
+import time
+import hashlib
+import fcntl
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import airtable
+import search
+import todo
+
+# ==================== 
+# Configuration
+# ==================== 
+
+CACHE_DB = os.environ.get('CACHE_DB', '/tmp/dot-app-cache.sqlite3')
+CACHE_LOCK = os.environ.get('CACHE_LOCK', CACHE_DB + '.lock')
+REFRESH_SECONDS = int(os.environ.get('CACHE_REFRESH_SECONDS', 60))
+# While a live Airtable webhook pushes changes, polling is only a safety net
+WEBHOOK_REFRESH_SECONDS = int(os.environ.get('CACHE_WEBHOOK_REFRESH_SECONDS', 3600))
+WEBHOOK_ID = os.environ.get('AIRTABLE_WEBHOOK_ID', '')
+MAINTAIN_TICK = 5
+WARMUP_BUDGET = float(os.environ.get('WARMUP_BUDGET', 10))
+REPLACE_ATTEMPTS = 3  # Full reads tried while changes keep landing mid-fetch
+
+# Snapshot name -> loader returning raw Airtable records
+SNAPSHOTS = {
+    'projects': lambda: airtable.fetch_records(
+        'Projects', {'filterByFormula': airtable.build_status_formula('active')}
+    ),
+    'clients': lambda: airtable.fetch_records('Clients'),
+    'meetings': lambda: airtable.fetch_records('Meetings'),
+    'tracker': lambda: airtable.fetch_records('Tracker'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    refreshed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    snapshot TEXT NOT NULL,
+    id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (snapshot, id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# ==================== 
+# Connection (per process)
+# ==================== 
+
+_conn = None
+_conn_pid = None
+_db_lock = threading.RLock()
+
+
+def _db():
+    """SQLite connection for this process (re-opened after fork)."""
+    global _conn, _conn_pid
+
+    pid = os.getpid()
+    if _conn is not None and _conn_pid == pid:
+        return _conn
+
+    conn = sqlite3.connect(CACHE_DB, timeout=10, check_same_thread=False, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+
+    _conn = conn
+    _conn_pid = pid
+    return conn
+
+
+@contextmanager
+def db():
+    """Locked access to this process's cache DB, for modules keeping their own tables."""
+    with _db_lock:
+        yield _db()
+
+
+def _store_version(name):
+    """(version, refreshed_at) for a snapshot, or (0, 0) if never stored."""
+    with _db_lock:
+        row = _db().execute(
+            'SELECT version, refreshed_at FROM snapshots WHERE name = ?', (name,)
+        ).fetchone()
+    return row if row else (0, 0)
+
+
+def _bump_version(conn, name):
+    conn.execute(
+        'INSERT INTO snapshots (name, version, refreshed_at) VALUES (?, 1, ?) '
+        'ON CONFLICT(name) DO UPDATE SET version = version + 1',
+        (name, time.time())
+    )
+    return conn.execute('SELECT version FROM snapshots WHERE name = ?', (name,)).fetchone()[0]
+
+
+def get_meta(key, default=None):
+    with _db_lock:
+        row = _db().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+
+def set_meta(key, value):
+    with _db_lock:
+        _db().execute(
+            'INSERT INTO meta (key, value) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+            (key, json.dumps(value))
+        )
+
+
+# ==================== 
+# Local Copies
+# ==================== 
+
+# name -> {'version': int, 'records': {id: record}}
+_local = {}
+# view key -> (snapshot name, version, value)
+_views = {}
+_fill_locks = {name: threading.Lock() for name in SNAPSHOTS}
+
+
+def _load_local(name, version):
+    """Decode a snapshot from the store into this worker's memory."""
+    with _db_lock:
+        rows = _db().execute(
+            'SELECT id, payload FROM records WHERE snapshot = ? ORDER BY rowid', (name,)
+        ).fetchall()
+    _local[name] = {
+        'version': version,
+        'records': {record_id: json.loads(payload) for record_id, payload in rows}
+    }
+    return _local[name]
+
+
+def get_records(name):
+    """
+    Raw records for a snapshot as (version, {id: record}).
+    Reloads only when another worker has published a new version.
+    Fills the store on first use if it is empty.
+    """
+    version, _ = _store_version(name)
+
+    if version == 0:
+        with _fill_locks[name]:
+            version, _ = _store_version(name)
+            if version == 0:
+                version = refresh(name, max_age=refresh_seconds())
+                if version == 0:
+                    return 0, {}
+
+    local = _local.get(name)
+    if local and local['version'] == version:
+        return version, local['records']
+
+    local = _load_local(name, version)
+    return version, local['records']
+
+
+def view(key, name, build):
+    """
+    Derived data memoised per snapshot version.
+    build(records) runs once per worker per version.
+    """
+    version, records = get_records(name)
+
+    cached = _views.get(key)
+    if cached and cached[1] == version:
+        return cached[2]
+
+    value = build(list(records.values()))
+    _views[key] = (name, version, value)
+    return value
+
+
+def _patch_views(name, previous, version, upserts, replaced):
+    """
+    Carry views of a snapshot forward to a new version in place, where a
+    patcher exists. Views without one rebuild on their next read.
+    """
+    for key, (view_name, view_version, value) in list(_views.items()):
+        if view_name != name or view_version != previous:
+            continue
+        patcher = VIEW_PATCHERS.get(key)
+        if patcher:
+            patcher(value, upserts, replaced)
+            _views[key] = (name, version, value)
+
+
+# ==================== 
+# Writes
+# ==================== 
+
+def acquire_file_lock(path):
+    """
+    Exclusive flock, polled so a gevent worker keeps serving while it waits.
+    Close the returned file to release it.
+    """
+    f = open(path, 'w')
+    while True:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return f
+        except OSError:
+            time.sleep(0.05)
+
+
+def refresh(name, max_age=None):
+    """
+    Replace a snapshot with a fresh Airtable read.
+    With max_age, skips the read if another worker refreshed it
+    within that many seconds (so cold fills don't dogpile).
+    Returns the new version, or the current one if the fetch failed.
+    """
+    lock = acquire_file_lock(f'{CACHE_LOCK}.{name}')
+    try:
+        if max_age is not None:
+            version, refreshed_at = _store_version(name)
+            if version and time.time() - refreshed_at < max_age:
+                return version
+
+        return _replace_snapshot(name)
+    finally:
+        lock.close()
+
+
+def _replace_snapshot(name):
+    """
+    Swap in a full read. If changes were applied while it was fetching,
+    that read may predate them - throw it away and fetch again.
+    """
+    for _attempt in range(REPLACE_ATTEMPTS):
+        started = _store_version(name)[0]
+        try:
+            records = SNAPSHOTS[name]()
+        except Exception as e:
+            print(f'[Cache] Refresh of {name} failed: {e}')
+            return _store_version(name)[0]
+
+        version = _store_records(name, started, records)
+        if version is not None:
+            return version
+        print(f'[Cache] {name} changed during refresh - fetching again')
+
+    print(f'[Cache] Gave up refreshing {name} after {REPLACE_ATTEMPTS} attempts')
+    return _store_version(name)[0]
+
+
+def _store_records(name, started, records):
+    """
+    Replace a snapshot's records, unless its version has moved past
+    started (returns None). Returns the stored version.
+    """
+    payloads = [(name, r['id'], json.dumps(r)) for r in records]
+    digest = hashlib.sha256('\n'.join(p[2] for p in payloads).encode('utf-8')).hexdigest()
+    hash_key = f'snapshot_hash:{name}'
+
+    with _db_lock:
+        conn = _db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            version, _ = _store_version(name)
+            if version != started:
+                conn.execute('ROLLBACK')
+                return None
+
+            stored = conn.execute('SELECT value FROM meta WHERE key = ?', (hash_key,)).fetchone()
+            if version and stored and json.loads(stored[0]) == digest:
+                # Nothing changed - keep the version so workers keep their views
+                conn.execute('UPDATE snapshots SET refreshed_at = ? WHERE name = ?', (time.time(), name))
+                conn.execute('COMMIT')
+                return version
+
+            conn.execute('DELETE FROM records WHERE snapshot = ?', (name,))
+            conn.executemany('INSERT INTO records (snapshot, id, payload) VALUES (?, ?, ?)', payloads)
+            version = _bump_version(conn, name)
+            conn.execute('UPDATE snapshots SET refreshed_at = ? WHERE name = ?', (time.time(), name))
+            conn.execute(
+                'INSERT INTO meta (key, value) VALUES (?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+                (hash_key, json.dumps(digest))
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    _local[name] = {'version': version, 'records': {r['id']: r for r in records}}
+    print(f'[Cache] Refreshed {name}: {len(records)} records (v{version})')
+    return version
+
+
+def apply_changes(name, upserts=(), deletes=()):
+    """
+    Write changed records into a snapshot without a full refresh.
+    Patches this worker's copy in place; other workers reload on
+    their next read because the version moves.
+
+    Args:
+        name: snapshot name
+        upserts: raw Airtable records (must have 'id')
+        deletes: record IDs to drop
+    """
+    upserts = list(upserts)
+    deletes = list(deletes)
+    if not upserts and not deletes:
+        return _store_version(name)[0]
+
+    with _db_lock:
+        conn = _db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            previous = conn.execute(
+                'SELECT version FROM snapshots WHERE name = ?', (name,)
+            ).fetchone()
+            if not previous:
+                # Never filled - a partial snapshot would look complete
+                conn.execute('ROLLBACK')
+                return 0
+            conn.executemany(
+                'INSERT INTO records (snapshot, id, payload) VALUES (?, ?, ?) '
+                'ON CONFLICT(snapshot, id) DO UPDATE SET payload = excluded.payload',
+                [(name, r['id'], json.dumps(r)) for r in upserts]
+            )
+            conn.executemany(
+                'DELETE FROM records WHERE snapshot = ? AND id = ?',
+                [(name, record_id) for record_id in deletes]
+            )
+            # The store no longer matches the last full read
+            conn.execute('DELETE FROM meta WHERE key = ?', (f'snapshot_hash:{name}',))
+            version = _bump_version(conn, name)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    local = _local.get(name)
+    if local and local['version'] == previous[0]:
+        # Old copies of everything touched, so views can unindex them
+        touched = [r['id'] for r in upserts] + deletes
+        replaced = [local['records'][rid] for rid in touched if rid in local['records']]
+
+        for record in upserts:
+            local['records'][record['id']] = record
+        for record_id in deletes:
+            local['records'].pop(record_id, None)
+        local['version'] = version
+
+        _patch_views(name, previous[0], version, upserts, replaced)
+
+    return version
+
+
+# ==================== 
+# Refresher Election
+# ==================== 
+
+_lock_file = None
+_maintainer_pid = None
+
+
+def is_refresher():
+    return _lock_file is not None and _maintainer_pid == os.getpid()
+
+
+def _try_elect():
+    """Take the host-wide refresher lock if nobody holds it."""
+    global _lock_file
+
+    if _lock_file is not None:
+        return True
+
+    f = open(CACHE_LOCK, 'w')
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+
+    f.write(str(os.getpid()))
+    f.flush()
+    _lock_file = f
+    print(f'[Cache] Worker {os.getpid()} is the snapshot refresher')
+    return True
+
+
+_refresher_tasks = []
+
+
+def add_refresher_task(task):
+    """Run task() on each maintenance tick of whichever worker is the refresher."""
+    if task not in _refresher_tasks:
+        _refresher_tasks.append(task)
+
+
+def webhook_alive_key(webhook_id):
+    """Meta key webhooks.keep_alive records the webhook's health under."""
+    return f'webhook_alive:{webhook_id}'
+
+
+def refresh_seconds():
+    """Snapshot max age - long only while the webhook is confirmed alive."""
+    if WEBHOOK_ID and get_meta(webhook_alive_key(WEBHOOK_ID), False):
+        return WEBHOOK_REFRESH_SECONDS
+    return REFRESH_SECONDS
+
+
+def _maintain():
+    """
+    Background loop run by every worker. Whoever holds the lock
+    refreshes stale snapshots; the rest keep trying to take over
+    in case the refresher dies.
+    """
+    while True:
+        try:
+            if _try_elect():
+                for task in _refresher_tasks:
+                    task()
+                max_age = refresh_seconds()
+                for name in SNAPSHOTS:
+                    refresh(name, max_age=max_age)
+        except Exception as e:
+            print(f'[Cache] Maintenance error: {e}')
+
+        time.sleep(MAINTAIN_TICK)
+
+
+def start():
+    """Start the maintenance loop for this process (once per worker)."""
+    global _maintainer_pid, _lock_file
+
+    pid = os.getpid()
+    if _maintainer_pid == pid:
+        return
+
+    # A forked child must not think it holds its parent's lock
+    _lock_file = None
+    _maintainer_pid = pid
+
+    thread = threading.Thread(target=_maintain, daemon=True)
+    thread.start()
+
+    todo.start_scheduler(rebuild_todo_view)
+
+
+# ==================== 
+# Views
+# ==================== 
+
+def list_job(record):
+    """Job as shown in lists - history trimmed to a preview."""
+    return airtable.transform_project(record, airtable.HISTORY_PREVIEW)
+
+
+def get_active_jobs():
+    """All active jobs (universal schema, history preview only)."""
+    start()
+    return view('jobs', 'projects', lambda records: [list_job(r) for r in records])
+
+
+def get_active_jobs_full():
+    """All active jobs with full update history (Ask Dot context)."""
+    start()
+    return view('jobs_full', 'projects', lambda records: [airtable.transform_project(r) for r in records])
+
+
+def get_project_record_id(job_number):
+    """Airtable record ID for an active job, or None."""
+    start()
+    return view('project_ids', 'projects', lambda records: {
+        r.get('fields', {}).get('Job Number'): r['id'] for r in records
+    }).get(job_number)
+
+
+def apply_project(record):
+    """
+    Write one Projects record (e.g. from a PATCH response) into the
+    active snapshot - or drop it if it is no longer active.
+    """
+    status = record.get('fields', {}).get('Status', 'Incoming')
+    if status in airtable.ACTIVE_STATUSES:
+        return apply_changes('projects', upserts=[record])
+    return apply_changes('projects', deletes=[record['id']])
+
+
+def get_jobs_for_client(client_code):
+    """Active jobs whose number starts with the client code."""
+    return [j for j in get_active_jobs() if j['jobNumber'].startswith(client_code)]
+
+
+def get_job_index():
+    """Search index over active jobs (rebuilt once per snapshot version)."""
+    start()
+    return view('job_index', 'projects', lambda records: search.JobIndex(get_active_jobs()))
+
+
+def get_todo_view():
+    """
+    Materialised To Do buckets. Patched in place on job changes; rebuilt
+    on a new snapshot version or when the NZ day has moved on.
+    """
+    start()
+    cached = _views.get('todo')
+    if cached and cached[2].day != todo.nz_dates()[0]:
+        _views.pop('todo', None)
+    return view('todo', 'projects', lambda records: todo.TodoView(get_active_jobs()))
+
+
+def rebuild_todo_view():
+    _views.pop('todo', None)
+    return get_todo_view()
+
+
+def get_project_record(job_number):
+    """Raw Projects record for an active job, or None."""
+    record_id = get_project_record_id(job_number)
+    if not record_id:
+        return None
+    return get_records('projects')[1].get(record_id)
+
+
+def get_job(job_number):
+    """A single active job with full history, or None if it's not in the snapshot."""
+    record = get_project_record(job_number)
+    return airtable.transform_project(record) if record else None
+
+
+def _patch_jobs(jobs, upserts, replaced, transform=list_job):
+    """Replace changed jobs in place (keeps list order), drop removed ones."""
+    positions = {job['jobNumber']: i for i, job in enumerate(jobs)}
+    gone = {r.get('fields', {}).get('Job Number') for r in replaced}
+
+    for record in upserts:
+        job = transform(record)
+        gone.discard(job['jobNumber'])
+        if job['jobNumber'] in positions:
+            jobs[positions[job['jobNumber']]] = job
+        else:
+            jobs.append(job)
+
+    if gone:
+        jobs[:] = [job for job in jobs if job['jobNumber'] not in gone]
+
+
+def _patch_job_index(index, upserts, replaced):
+    for record in replaced:
+        index.remove(record.get('fields', {}).get('Job Number'))
+    for record in upserts:
+        index.apply(list_job(record))
+
+
+def _patch_todo(view, upserts, replaced):
+    for record in replaced:
+        view.remove(record.get('fields', {}).get('Job Number'))
+    for record in upserts:
+        view.apply(list_job(record))
+
+
+VIEW_PATCHERS = {
+    'jobs': _patch_jobs,
+    'jobs_full': lambda jobs, upserts, replaced: _patch_jobs(jobs, upserts, replaced, airtable.transform_project),
+    'job_index': _patch_job_index,
+    'todo': _patch_todo,
+}
+
+
+def get_clients():
+    start()
+    return view('clients', 'clients', airtable.build_clients)
+
+
+def get_tracker_clients():
+    start()
+    return view('tracker_clients', 'clients', airtable.build_tracker_clients)
+
+
+def get_tracker_rows():
+    """Non-zero spend rows for every client."""
+    start()
+
+    def build(records):
+        rows = [airtable.transform_tracker_record(r) for r in records]
+        return [row for row in rows if row]
+
+    return view('tracker_rows', 'tracker', build)
+
+
+def get_tracker_for_client(client_code):
+    return [row for row in get_tracker_rows() if row['client'] == client_code]
+
+
+def get_meetings():
+    """Meetings for today and next workday (bucketed per call - dates move)."""
+    start()
+    _, records = get_records('meetings')
+    today, next_day, _ = todo.nz_dates()
+    return airtable.build_meetings(records.values(), today, next_day)
+
+
+# ==================== 
+# Warm-up
+# ==================== 
+
+_warm = {'pid': None, 'ready': False, 'startedAt': None, 'readyAt': None, 'loaded': [], 'timedOut': False}
+
+# (step, snapshot it needs, loader)
+WARMUP_STEPS = [
+    ('projects', 'projects', get_active_jobs),
+    ('todo', 'projects', get_todo_view),
+    ('clients', 'clients', get_clients),
+    ('trackerClients', 'clients', get_tracker_clients),
+    ('meetings', 'meetings', get_meetings),
+    ('tracker', 'tracker', get_tracker_rows),
+]
+WARMUP_RETRY = 1  # Seconds between passes over steps that didn't load
+
+
+def warm_up(budget=WARMUP_BUDGET):
+    """
+    Prefetch the hot snapshots for this worker in the background.
+    A step only counts once its snapshot holds real data (version > 0) -
+    failed fetches are retried. The worker reports ready once every step
+    has loaded, or when the budget runs out (timedOut), after which
+    anything missing loads on first use instead.
+    Safe to call repeatedly; runs once per process.
+    """
+    pid = os.getpid()
+    if _warm['pid'] == pid:
+        return
+
+    _warm.update({'pid': pid, 'ready': False, 'startedAt': time.time(), 'readyAt': None,
+                  'loaded': [], 'timedOut': False})
+    done = threading.Event()
+    deadline = time.time() + budget
+
+    def run():
+        start()
+        pending = list(WARMUP_STEPS)
+        while pending:
+            for step in list(pending):
+                name, snapshot, load = step
+                try:
+                    load()
+                    if get_records(snapshot)[0]:
+                        _warm['loaded'].append(name)
+                        pending.remove(step)
+                except Exception as e:
+                    print(f'[Cache] Warm-up step {name} failed: {e}')
+            if pending:
+                if time.time() + WARMUP_RETRY >= deadline:
+                    print(f"[Cache] Warm-up gave up on: {', '.join(step[0] for step in pending)}")
+                    return
+                time.sleep(WARMUP_RETRY)
+        done.set()
+
+    def watch():
+        if not done.wait(budget):
+            _warm['timedOut'] = True
+            print(f'[Cache] Warm-up budget ({budget}s) spent, serving anyway')
+        _warm['ready'] = True
+        _warm['readyAt'] = time.time()
+        print(f"[Cache] Worker {pid} ready in {_warm['readyAt'] - _warm['startedAt']:.2f}s")
+
+    threading.Thread(target=run, daemon=True).start()
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def warm_status():
+    """Readiness for /health (this worker only)."""
+    return {
+        'ready': _warm['ready'] and _warm['pid'] == os.getpid(),
+        'loaded': list(_warm['loaded']),
+        'timedOut': _warm['timedOut'],
+    }
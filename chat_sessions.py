@@ -0,0 +1,148 @@
+"""
+Dot App - Chat Sessions
+Server-held Ask Dot conversations, so clients send only the new message.
+
+Sessions live in the shared cache DB (one table), so any worker can
+pick up the next turn. Each keeps a bounded number of recent messages;
+older ones are either dropped or folded into a short recap, and idle
+sessions expire.
+"""
+
+import os
+import json
+import time
+import uuid
+
+import cache
+
+# ==================== 
+# Configuration
+# ==================== 
+
+MAX_MESSAGES = int(os.environ.get('CHAT_MAX_MESSAGES', 20))      # Verbatim history kept (user + assistant)
+SESSION_TTL = int(os.environ.get('CHAT_SESSION_TTL', 2 * 60 * 60))  # Seconds idle before eviction
+# 'truncate' drops overflow; 'summarize' keeps a recap, sent to Brain as historySummary
+OVERFLOW_POLICY = os.environ.get('CHAT_OVERFLOW_POLICY', 'truncate')
+SUMMARY_MAX_CHARS = 600
+SUMMARY_SNIPPET_CHARS = 80
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    messages TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chat_sessions_updated ON chat_sessions (updated_at);
+"""
+
+_schema_pid = None
+
+
+def _ensure_schema(conn):
+    global _schema_pid
+    if _schema_pid != os.getpid():
+        conn.executescript(SCHEMA)
+        _schema_pid = os.getpid()
+
+
+# ==================== 
+# Sessions
+# ==================== 
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def load(session_id, user):
+    """
+    Session state for this user: {'messages': [...], 'summary': '...'}.
+    Unknown, expired or someone else's sessions come back empty.
+    """
+    with cache.db() as conn:
+        _ensure_schema(conn)
+        row = conn.execute(
+            'SELECT user, messages, summary, updated_at FROM chat_sessions WHERE id = ?',
+            (session_id,)
+        ).fetchone()
+
+    if not row:
+        return {'messages': [], 'summary': ''}
+
+    owner, messages, summary, updated_at = row
+    if owner != user or time.time() - updated_at > SESSION_TTL:
+        return {'messages': [], 'summary': ''}
+
+    return {'messages': json.loads(messages), 'summary': summary}
+
+
+def save(session_id, user, state):
+    """Store a session and evict anything idle past the TTL."""
+    now = time.time()
+    with cache.db() as conn:
+        _ensure_schema(conn)
+        conn.execute(
+            'INSERT INTO chat_sessions (id, user, messages, summary, updated_at) VALUES (?, ?, ?, ?, ?) '
+            'ON CONFLICT(id) DO UPDATE SET user = excluded.user, messages = excluded.messages, '
+            'summary = excluded.summary, updated_at = excluded.updated_at',
+            (session_id, user, json.dumps(state['messages']), state['summary'], now)
+        )
+        conn.execute('DELETE FROM chat_sessions WHERE updated_at < ?', (now - SESSION_TTL,))
+
+
+# ==================== 
+# History Policy
+# ==================== 
+
+def add_turn(state, user_message, assistant_message):
+    """
+    Append a completed exchange and enforce MAX_MESSAGES.
+    Messages are dropped in user/assistant pairs so history always
+    starts with a user turn.
+    """
+    messages = state['messages'] + [
+        {'role': 'user', 'content': user_message},
+        {'role': 'assistant', 'content': assistant_message},
+    ]
+
+    overflow = []
+    while len(messages) > MAX_MESSAGES:
+        overflow.extend(messages[:2])
+        messages = messages[2:]
+
+    summary = state['summary']
+    if overflow and OVERFLOW_POLICY == 'summarize':
+        summary = summarize(summary, overflow)
+
+    return {'messages': messages, 'summary': summary}
+
+
+def summarize(summary, dropped):
+    """
+    Fold dropped messages into a short recap of what was asked.
+    Keeps the most recent questions when it outgrows SUMMARY_MAX_CHARS.
+    """
+    asked = [m['content'].strip().replace('\n', ' ') for m in dropped if m['role'] == 'user']
+    snippets = [a[:SUMMARY_SNIPPET_CHARS] + ('...' if len(a) > SUMMARY_SNIPPET_CHARS else '') for a in asked]
+
+    lines = [line for line in summary.split('\n') if line] + [f'- {s}' for s in snippets if s]
+    while lines and len('\n'.join(lines)) > SUMMARY_MAX_CHARS:
+        lines.pop(0)
+
+    return '\n'.join(lines)
+
+
+def history_for_brain(state):
+    """Verbatim history in Brain's format - only turns that actually happened."""
+    return list(state['messages'])
+
+
+def summary_for_brain(state):
+    """
+    Recap of turns dropped from history, or ''. Sent to Brain as its own
+    field so it is context, not a turn anyone said.
+    """
+    if not state['summary']:
+        return ''
+    return 'Earlier in this conversation the user asked about:\n' + state['summary']
@@ -0,0 +1,193 @@
+"""
+Dot App - Live Events
+Server-Sent Events fan-out for job and tracker changes.
+Each worker keeps its own subscriber queues; workers on the same
+host relay events to each other over unix datagram sockets.
+"""
+
+import os
+import json
+import glob
+import queue
+import socket
+import threading
+import time
+
+# ==================== 
+# Configuration
+# ==================== 
+
+EVENTS_DIR = os.environ.get('EVENTS_DIR', '/tmp/dot-app-events')
+HEARTBEAT_SECONDS = int(os.environ.get('EVENTS_HEARTBEAT', 20))
+RETRY_MS = 5000
+MAX_QUEUE = 100
+MAX_DATAGRAM = 65000
+
+# ==================== 
+# Local Subscribers
+# ==================== 
+
+_subscribers = set()
+_lock = threading.Lock()
+
+
+def _deliver_local(event):
+    """Push an event onto every subscriber queue in this worker."""
+    with _lock:
+        subscribers = list(_subscribers)
+
+    for q in subscribers:
+        try:
+            q.put_nowait(event)
+        except queue.Full:
+            # Slow client - drop rather than block everyone else
+            pass
+
+
+def format_sse(event_type, data):
+    """Encode one event in text/event-stream format."""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+def subscribe():
+    """
+    Generator for a single SSE connection.
+    Yields events as they arrive, with comment heartbeats in between
+    so proxies don't close idle connections.
+    """
+    _ensure_relay()
+
+    q = queue.Queue(maxsize=MAX_QUEUE)
+    with _lock:
+        _subscribers.add(q)
+
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+
+        while True:
+            try:
+                event = q.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield ': ping\n\n'
+                continue
+
+            yield format_sse(event['type'], event['data'])
+    finally:
+        with _lock:
+            _subscribers.discard(q)
+
+
+def subscriber_count():
+    with _lock:
+        return len(_subscribers)
+
+
+# ==================== 
+# Cross-Worker Relay
+# ==================== 
+
+_relay_sock = None
+_relay_path = None
+_relay_pid = None
+
+
+def _ensure_relay():
+    """
+    Bind this worker's relay socket (once per process).
+    Re-binds after fork so each gunicorn worker gets its own socket.
+    """
+    global _relay_sock, _relay_path, _relay_pid
+
+    pid = os.getpid()
+    if _relay_pid == pid:
+        return
+
+    with _lock:
+        if _relay_pid == pid:
+            return
+
+        try:
+            os.makedirs(EVENTS_DIR, exist_ok=True)
+            path = os.path.join(EVENTS_DIR, f'{pid}.sock')
+            if os.path.exists(path):
+                os.unlink(path)
+
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(path)
+        except OSError as e:
+            print(f'[Events] Relay unavailable, local fan-out only: {e}')
+            _relay_pid = pid
+            return
+
+        _relay_sock = sock
+        _relay_path = path
+        _relay_pid = pid
+
+    thread = threading.Thread(target=_listen, args=(sock,), daemon=True)
+    thread.start()
+
+
+def _listen(sock):
+    """Receive events relayed from other workers."""
+    while True:
+        try:
+            payload, _ = sock.recvfrom(MAX_DATAGRAM)
+            event = json.loads(payload)
+        except OSError:
+            return
+        except ValueError:
+            continue
+
+        _deliver_local(event)
+
+
+def _relay(event):
+    """Send an event to every other worker's relay socket."""
+    payload = json.dumps(event).encode('utf-8')
+    if len(payload) > MAX_DATAGRAM:
+        print(f"[Events] Event too large to relay: {event['type']}")
+        return
+
+    sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sender.setblocking(False)
+    try:
+        for path in glob.glob(os.path.join(EVENTS_DIR, '*.sock')):
+            if path == _relay_path:
+                continue
+            try:
+                sender.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker has gone away - clean up its socket
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                # Receiver's buffer is full - drop rather than stall the request
+                pass
+            except OSError as e:
+                print(f'[Events] Relay to {path} failed: {e}')
+    finally:
+        sender.close()
+
+
+# ==================== 
+# Publishing
+# ==================== 
+
+def publish(event_type, data):
+    """
+    Broadcast an event to all connected clients on this host.
+    Never raises - events are best-effort notifications.
+
+    Args:
+        event_type: 'job' or 'tracker'
+        data: JSON-serialisable payload
+    """
+    try:
+        _ensure_relay()
+        event = {'type': event_type, 'data': data, 'ts': time.time()}
+        _deliver_local(event)
+        _relay(event)
+    except Exception as e:
+        print(f'[Events] Publish failed (non-blocking): {e}')
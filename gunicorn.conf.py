@@ -0,0 +1,48 @@
+"""
+Dot App - Gunicorn Config
+Evented (gevent) serving mode for I/O-bound routes.
+
+Almost every route spends its time waiting on Airtable or Brain, so
+each worker runs many greenlets instead of one request at a time.
+gevent patches sockets before the app is imported, which makes
+`requests` (Airtable, Brain, Teams proxy), the SSE relay and
+time.sleep cooperative - no code changes needed in the routes.
+
+Sizing
+------
+WEB_CONCURRENCY   Worker processes. One per CPU core is plenty - the
+                  work is waiting, not computing. Default 2.
+WORKER_CONNECTIONS  Concurrent requests (incl. open SSE streams) per
+                  worker. Default 100. Each open To Do / Ask Dot tab
+                  holds one for /api/events.
+HTTP_POOL_SIZE    Pooled upstream connections per worker (see
+                  airtable.py). Keep it well under WORKER_CONNECTIONS;
+                  Airtable allows ~5 req/s per base, so extra
+                  connections just queue there instead of here.
+
+A 512MB dyno with 2 workers x 100 connections handles dozens of
+concurrent chats and page loads. Raise WORKER_CONNECTIONS before
+adding workers; add workers only if CPU (JSON encoding) is saturated.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+worker_class = 'gevent'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 100))
+
+# Brain calls can take up to 30s; SSE streams heartbeat every 20s
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+
+
+def post_worker_init(worker):
+    """Warm the worker: app modules are imported by now; prefetch snapshots."""
+    import cache
+    import webhooks
+    cache.warm_up()
+    webhooks.catch_up()
@@ -0,0 +1,162 @@
+"""
+Dot App - Request Recorder
+Opt-in capture of API traffic for load testing (see tools/loadtest.py).
+
+Set RECORD_REQUESTS=/path/to/traffic.jsonl and every API request is
+appended as one JSON line: route, method, status, timing, response size,
+upstream calls made, and a sanitised picture of the input. Nothing that
+identifies people or says what they wrote is kept:
+
+- users and path values (job numbers) are keyed hashes - stable within
+  a capture, so sessions can be replayed, but not reversible
+- query params and JSON body fields keep their value only if they are
+  enumerations or dates (status, sort, stage...); anything else is
+  reduced to its type and length
+
+Upstream calls (Airtable, Brain, Teams proxy) are counted per request;
+with recording or UPSTREAM_CALLS_HEADER=1 the count is also sent back as
+X-Upstream-Calls.
+"""
+
+import os
+import hmac
+import json
+import time
+import hashlib
+import threading
+
+from flask import g, has_request_context, request, session
+
+# ==================== 
+# Configuration
+# ==================== 
+
+RECORD_FILE = os.environ.get('RECORD_REQUESTS', '')
+UPSTREAM_HEADER = bool(RECORD_FILE) or os.environ.get('UPSTREAM_CALLS_HEADER') == '1'
+
+# Values safe to keep verbatim - enumerations, dates, client codes
+SAFE_PARAMS = {'status', 'sort', 'limit', 'client', 'stage', 'withClient', 'dueBefore'}
+SAFE_FIELDS = {'status', 'stage', 'withClient', 'updateDue', 'liveDate'}
+
+# Not API traffic - never recorded
+SKIP_ENDPOINTS = {
+    'index', 'serve_static', 'static', 'dist_asset', 'service_worker',
+    'health', 'health_ready', 'metrics', 'events_stream',
+}
+
+
+# ==================== 
+# Sanitising
+# ==================== 
+
+def _hash(value, key):
+    return hmac.new(key, str(value).encode('utf-8'), hashlib.sha256).hexdigest()[:12]
+
+
+def shape(value):
+    """A value's type and size, without its content: 'str:42', 'num', {'a': 'bool'}."""
+    if isinstance(value, dict):
+        return {k: shape(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return f'list:{len(value)}'
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, (int, float)):
+        return 'num'
+    if value is None:
+        return 'null'
+    return f'str:{len(str(value))}'
+
+
+def sanitise_body(body):
+    if not isinstance(body, dict):
+        return shape(body)
+    return {k: v if k in SAFE_FIELDS else shape(v) for k, v in body.items()}
+
+
+def sanitise_params(args):
+    return {k: v if k in SAFE_PARAMS else shape(v) for k, v in args.items()}
+
+
+# ==================== 
+# Upstream Calls
+# ==================== 
+
+def count_upstream(response, *args, **kwargs):
+    """requests response hook - counts calls made while handling a request."""
+    if has_request_context():
+        g.upstream_calls = g.get('upstream_calls', 0) + 1
+    return response
+
+
+def watch(http_session):
+    """Count every call made through a requests.Session."""
+    http_session.hooks['response'].append(count_upstream)
+
+
+# ==================== 
+# Middleware
+# ==================== 
+
+_write_lock = threading.Lock()
+_file = None
+
+
+def _append(entry):
+    global _file
+    line = json.dumps(entry, separators=(',', ':')) + '\n'
+    with _write_lock:
+        if _file is None:
+            _file = open(RECORD_FILE, 'a', encoding='utf-8')
+        _file.write(line)
+        _file.flush()
+
+
+def install(app, *http_sessions):
+    """Hook the recorder into app and count calls on the given sessions."""
+    for http_session in http_sessions:
+        watch(http_session)
+
+    if not UPSTREAM_HEADER:
+        return
+
+    key = app.secret_key.encode('utf-8') if isinstance(app.secret_key, str) else app.secret_key
+
+    @app.before_request
+    def start_recording():
+        g.record_ts = time.time()
+        g.record_start = time.perf_counter()
+        g.upstream_calls = 0
+
+    @app.after_request
+    def finish_recording(response):
+        calls = g.get('upstream_calls', 0)
+        response.headers['X-Upstream-Calls'] = str(calls)
+
+        if not RECORD_FILE or request.endpoint in SKIP_ENDPOINTS or not request.url_rule:
+            return response
+
+        try:
+            body = request.get_json(silent=True) if request.is_json else None
+            user = session.get('user')
+            _append({
+                'ts': round(g.get('record_ts', time.time()), 3),
+                'user': _hash(user, key) if user else None,
+                'method': request.method,
+                'route': request.url_rule.rule,
+                'endpoint': request.endpoint,
+                'args': {k: _hash(v, key) for k, v in (request.view_args or {}).items()},
+                'params': sanitise_params(request.args),
+                'body': sanitise_body(body) if body is not None else None,
+                'status': response.status_code,
+                # Streamed responses (exports) are timed, and calls counted, up to the headers
+                'ms': round((time.perf_counter() - g.get('record_start', time.perf_counter())) * 1000, 1),
+                'bytes': response.content_length,
+                'upstream': calls,
+            })
+        except Exception as e:
+            print(f'[Recorder] Failed to record {request.path}: {e}')
+
+        return response
+
+    print(f"[Recorder] {'Recording to ' + RECORD_FILE if RECORD_FILE else 'Upstream call header on'}")
@@ -0,0 +1,236 @@
+"""
+Dot App - Job Search Index
+In-memory index over the active job snapshot.
+Built once per snapshot version (see cache.get_job_index) and patched
+in place when a single job changes.
+"""
+
+import re
+import json
+import base64
+from bisect import bisect_left, bisect_right, insort
+
+# ==================== 
+# Configuration
+# ==================== 
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+NO_DUE = '9999-12-31'  # Sorts undated jobs last
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase word tokens: 'SKY 017 - Summer promo' -> ['sky', '017', 'summer', 'promo']"""
+    return TOKEN_RE.findall(str(text or '').lower())
+
+
+def owner_keys(owner):
+    """Index owners by full name and first name ('Emma Moore' -> 'emma moore', 'emma')."""
+    owner = str(owner or '').strip().lower()
+    if not owner:
+        return []
+    first = owner.split(' ')[0]
+    return [owner] if first == owner else [owner, first]
+
+
+def sort_key(job):
+    return (job.get('updateDue') or NO_DUE, job.get('jobNumber', ''))
+
+
+# ==================== 
+# Cursors
+# ==================== 
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Cursor -> sort key of the last job returned, or None if invalid."""
+    try:
+        due, number = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (str(due), str(number))
+    except (ValueError, TypeError):
+        return None
+
+
+# ==================== 
+# Index
+# ==================== 
+
+class JobIndex:
+    """
+    Token, keyed and due-date indexes over a list of jobs (universal schema).
+
+    - tokens: word -> job numbers (jobNumber, jobName, description, theStory)
+    - by_client / by_owner / by_stage / by_status: key -> job numbers
+    - ordered: (updateDue, jobNumber) sorted - drives paging and dueBefore
+    """
+
+    KEYED = {
+        'by_client': lambda job: [str(job.get('clientCode') or '').upper()],
+        'by_owner': lambda job: owner_keys(job.get('projectOwner')),
+        'by_stage': lambda job: [str(job.get('stage') or '').lower()],
+        'by_status': lambda job: [str(job.get('status') or '').lower()],
+    }
+
+    def __init__(self, jobs):
+        self.jobs = {}
+        self.tokens = {}
+        self.vocabulary = []
+        self.ordered = []
+        for attr in self.KEYED:
+            setattr(self, attr, {})
+
+        for job in jobs:
+            if job.get('jobNumber') not in self.jobs:
+                self._add(job)
+
+        self.vocabulary = sorted(self.tokens)
+        self.ordered.sort()
+
+    # ---------- maintenance ----------
+
+    def _job_tokens(self, job):
+        text = ' '.join(str(job.get(f) or '') for f in ('jobNumber', 'jobName', 'description', 'theStory'))
+        return set(tokenize(text))
+
+    def _add(self, job, keep_sorted=False):
+        number = job.get('jobNumber')
+        if not number:
+            return
+
+        self.jobs[number] = job
+
+        for token in self._job_tokens(job):
+            if token not in self.tokens:
+                self.tokens[token] = set()
+                if keep_sorted:
+                    insort(self.vocabulary, token)
+            self.tokens[token].add(number)
+
+        for attr, keys in self.KEYED.items():
+            index = getattr(self, attr)
+            for key in keys(job):
+                if key:
+                    index.setdefault(key, set()).add(number)
+
+        if keep_sorted:
+            insort(self.ordered, sort_key(job))
+        else:
+            self.ordered.append(sort_key(job))
+
+    def remove(self, job_number):
+        """Drop a job from every index."""
+        job = self.jobs.pop(job_number, None)
+        if not job:
+            return
+
+        for token in self._job_tokens(job):
+            numbers = self.tokens.get(token)
+            if numbers is not None:
+                numbers.discard(job_number)
+                if not numbers:
+                    del self.tokens[token]
+                    i = bisect_left(self.vocabulary, token)
+                    if i < len(self.vocabulary) and self.vocabulary[i] == token:
+                        self.vocabulary.pop(i)
+
+        for attr, keys in self.KEYED.items():
+            index = getattr(self, attr)
+            for key in keys(job):
+                numbers = index.get(key)
+                if numbers is not None:
+                    numbers.discard(job_number)
+                    if not numbers:
+                        del index[key]
+
+        key = sort_key(job)
+        i = bisect_left(self.ordered, key)
+        if i < len(self.ordered) and self.ordered[i] == key:
+            self.ordered.pop(i)
+
+    def apply(self, job):
+        """Insert or replace a single job in place."""
+        self.remove(job.get('jobNumber'))
+        self._add(job, keep_sorted=True)
+
+    # ---------- queries ----------
+
+    def get(self, job_number):
+        return self.jobs.get(job_number)
+
+    def _match_token(self, token):
+        """Job numbers for any indexed word starting with token (prefix search)."""
+        start = bisect_left(self.vocabulary, token)
+        end = bisect_right(self.vocabulary, token + '\uffff')
+        matches = set()
+        for word in self.vocabulary[start:end]:
+            matches |= self.tokens[word]
+        return matches
+
+    def search(self, q='', status='', stage='', owner='', client='', with_client=None,
+               due_before='', cursor='', limit=DEFAULT_LIMIT):
+        """
+        Filter and page jobs, ordered by updateDue then jobNumber.
+        All filters are ANDed; q matches every word as a prefix.
+
+        Returns:
+            {'jobs': [...], 'nextCursor': '...' or None}
+        Raises ValueError for a cursor that doesn't decode.
+        """
+        candidates = None
+
+        def narrow(numbers):
+            nonlocal candidates
+            candidates = set(numbers) if candidates is None else candidates & numbers
+
+        for token in tokenize(q):
+            narrow(self._match_token(token))
+        if status:
+            narrow(self.by_status.get(status.lower(), set()))
+        if stage:
+            narrow(self.by_stage.get(stage.lower(), set()))
+        if owner:
+            narrow(self.by_owner.get(owner.strip().lower(), set()))
+        if client:
+            narrow(self.by_client.get(client.upper(), set()))
+
+        limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+        if cursor and decode_cursor(cursor) is None:
+            raise ValueError('Invalid cursor')
+        if candidates is not None and not candidates:
+            return {'jobs': [], 'nextCursor': None}
+
+        start = bisect_right(self.ordered, decode_cursor(cursor)) if cursor else 0
+
+        results = []
+        last_key = None
+        has_more = False
+
+        for i in range(start, len(self.ordered)):
+            key = self.ordered[i]
+            if due_before and key[0] >= due_before:
+                break
+
+            number = key[1]
+            if candidates is not None and number not in candidates:
+                continue
+
+            job = self.jobs[number]
+            if with_client is not None and bool(job.get('withClient')) != with_client:
+                continue
+
+            if len(results) == limit:
+                has_more = True
+                break
+
+            results.append(job)
+            last_key = key
+
+        return {
+            'jobs': results,
+            'nextCursor': encode_cursor(last_key) if has_more else None
+        }
@@ -10,7 +10,7 @@ let selectedClient = null;
 let previousScreen = 'home';
 let currentUser = null;
 let allJobs = [];  // Cache of all jobs for Ask Dot context
-let conversationHistory = [];  // Chat history for context
+let chatSessionId = null;  // Server-held chat history (see /api/chat)
 
 const VALID_PINS = {
     '9871': { name: 'Michael', fullName: 'Michael Goldthorpe' },
@@ -64,6 +64,9 @@ async function validatePin() {
         // Load jobs in background
         loadAllJobs();
         
+        // Listen for changes made by others
+        connectEvents();
+        
         goTo('home');
     } else {
         document.getElementById('pin-error').textContent = 'Invalid PIN';
@@ -100,6 +103,17 @@ async function loadAllJobs() {
     }
 }
 
+function upsertCachedJob(job) {
+    // Apply a job returned by the server to the local cache (no refetch)
+    if (!job || !job.jobNumber) return;
+    const index = allJobs.findIndex(j => j.jobNumber === job.jobNumber);
+    if (index >= 0) {
+        allJobs[index] = job;
+    } else {
+        allJobs.push(job);
+    }
+}
+
 async function loadJobsForClient(clientCode) {
     try {
         const response = await fetch(`/api/jobs?client=${clientCode}`);
@@ -124,6 +138,51 @@ async function loadTodoJobs() {
     return { today: { meetings: [], jobs: [] }, next: { label: 'Tomorrow', meetings: [], jobs: [] } };
 }
 
+// ==================== 
+// Live Events (SSE)
+// ==================== 
+
+let eventSource = null;
+
+function connectEvents() {
+    if (eventSource || !window.EventSource) return;
+    
+    // EventSource reconnects on its own (server sends retry interval)
+    eventSource = new EventSource('/api/events');
+    eventSource.addEventListener('job', (e) => handleJobEvent(JSON.parse(e.data)));
+    eventSource.addEventListener('tracker', (e) => handleTrackerEvent(JSON.parse(e.data)));
+}
+
+function isScreenActive(screen) {
+    return document.getElementById(screen + '-screen')?.classList.contains('active');
+}
+
+function handleJobEvent(data) {
+    console.log(`[App] Job changed: ${data.jobNumber}`);
+    if (data.job) {
+        upsertCachedJob(data.job);
+    } else {
+        loadAllJobs();
+    }
+    
+    // Refresh whichever list is on screen
+    if (isScreenActive('todo')) {
+        loadAndRenderTodo();
+    } else if (isScreenActive('jobs') && selectedClient?.code === data.clientCode) {
+        loadJobsForClient(selectedClient.code).then(renderJobs);
+    }
+}
+
+async function handleTrackerEvent(data) {
+    if (!isScreenActive('tracker-view')) return;
+    if (data.client && data.client !== currentTrackerClient) return;
+    
+    await loadTrackerClients();
+    await loadTrackerData(currentTrackerClient);
+    renderTrackerContent(currentTrackerClient);
+    setupMonthSwipe();
+}
+
 // ==================== 
 // Client Selection
 // ==================== 
@@ -496,10 +555,15 @@ async function saveUpdate() {
             throw new Error('Update failed');
         }
         
+        const data = await response.json();
         showToast('Updated!', 'success');
         
-        // Refresh jobs cache
-        loadAllJobs();
+        // Server returns the updated job - patch the cache instead of reloading
+        if (data.job) {
+            upsertCachedJob(data.job);
+        } else {
+            loadAllJobs();
+        }
         
         // Go back after short delay
         setTimeout(() => {
@@ -648,16 +712,13 @@ async function sendMessage() {
     container.innerHTML += `<div class="message dot thinking" id="thinking-msg">Thinking...</div>`;
     container.scrollTop = container.scrollHeight;
     
-    // Add to history before sending
-    conversationHistory.push({ role: 'user', content: message });
-    
     try {
         const response = await fetch('/api/chat', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
                 message: message,
-                history: conversationHistory.slice(0, -1)  // Send history without current message
+                sessionId: chatSessionId
             })
         });
         
@@ -669,17 +730,10 @@ async function sendMessage() {
         }
         
         const data = await response.json();
+        if (data.sessionId) chatSessionId = data.sessionId;
         const result = data.response || {};
         const dotMessage = result.message || "I'm not sure how to help with that.";
         
-        // Add assistant response to history
-        conversationHistory.push({ role: 'assistant', content: dotMessage });
-        
-        // Keep history manageable
-        if (conversationHistory.length > 20) {
-            conversationHistory = conversationHistory.slice(-20);
-        }
-        
         // Render response
         container.innerHTML += `<div class="message dot">${escapeHtml(dotMessage)}</div>`;
         
@@ -700,9 +754,6 @@ async function sendMessage() {
         // Remove thinking indicator
         document.getElementById('thinking-msg')?.remove();
         
-        // Remove failed message from history
-        conversationHistory.pop();
-        
         container.innerHTML += `<div class="message dot">Sorry, I got tangled up. Try again?</div>`;
         container.scrollTop = container.scrollHeight;
     }
@@ -713,6 +764,11 @@ async function sendMessage() {
 // ==================== 
 
 document.addEventListener('DOMContentLoaded', () => {
+    // Cache the app shell for instant launches (only served once assets are built)
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js').catch(() => {});
+    }
+    
     // Modal overlay click to close
     document.querySelectorAll('.modal-overlay').forEach(overlay => {
         overlay.addEventListener('click', (e) => {
@@ -0,0 +1,85 @@
+// Dot App - Service Worker
+// Precaches the app shell so launches don't wait on the network.
+// tools/build_assets.py fills in VERSION and PRECACHE (the page plus every
+// fingerprinted asset); the app only serves the built copy, at /sw.js.
+
+const VERSION = 'dev';
+const PRECACHE = [];
+const CACHE = `dot-shell-${VERSION}`;
+
+// ==================== 
+// Install / Activate
+// ==================== 
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(CACHE)
+            .then(cache => cache.addAll(PRECACHE))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', (event) => {
+    // Drop shells from previous builds
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key.startsWith('dot-shell-') && key !== CACHE)
+                    .map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+// ==================== 
+// Fetch
+// ==================== 
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin) return;
+
+    // Fingerprinted assets never change - cache first, forever
+    if (url.pathname.startsWith('/static/dist/')) {
+        event.respondWith(cacheFirst(request));
+        return;
+    }
+
+    // The page: serve the cached shell now, refresh it for next launch.
+    // Only the app's own URL - exports, /health and /metrics are navigations too
+    if (url.pathname === '/') {
+        event.respondWith(staleWhileRevalidate('/'));
+    }
+
+    // API, SSE, exports and everything else go straight to the network
+});
+
+async function cacheFirst(request) {
+    // Images are negotiated (WebP vs PNG) - any cached variant will do
+    const cached = await caches.match(request, { ignoreVary: true });
+    if (cached) return cached;
+
+    const response = await fetch(request);
+    if (response.ok) {
+        const cache = await caches.open(CACHE);
+        cache.put(request, response.clone());
+    }
+    return response;
+}
+
+async function staleWhileRevalidate(path) {
+    const cache = await caches.open(CACHE);
+    const cached = await cache.match(path, { ignoreVary: true });
+
+    const refresh = fetch(path)
+        .then(response => {
+            if (response.ok) cache.put(path, response.clone());
+            return response;
+        })
+        .catch(() => cached);
+
+    return cached || refresh;
+}
@@ -0,0 +1,64 @@
+"""
+Shared fixtures: the snapshot cache on a temp DB, fed from a list of
+raw Projects records instead of Airtable.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cache  # noqa: E402
+
+
+def project(number, owner='Emma Moore', due='2026-10-19', status='In Progress', **fields):
+    """Raw Projects record, keyed by job number."""
+    return {
+        'id': 'rec' + number.replace(' ', ''),
+        'fields': {
+            'Job Number': number,
+            'Project Name': f'{number} campaign',
+            'Project Owner': owner,
+            'Update Due': due,
+            'Status': status,
+            'Stage': 'Craft',
+            **fields,
+        },
+    }
+
+
+@pytest.fixture
+def projects(tmp_path, monkeypatch):
+    """
+    Records the projects snapshot is filled from. Append to it before the
+    first read; after that, change jobs with cache.apply_project.
+    """
+    records = []
+    monkeypatch.setattr(cache, 'CACHE_DB', str(tmp_path / 'cache.sqlite3'))
+    monkeypatch.setattr(cache, 'CACHE_LOCK', str(tmp_path / 'cache.lock'))
+    monkeypatch.setattr(cache, '_conn', None)
+    monkeypatch.setattr(cache, '_local', {})
+    monkeypatch.setattr(cache, '_views', {})
+    monkeypatch.setattr(cache, 'start', lambda: None)
+    monkeypatch.setitem(cache.SNAPSHOTS, 'projects', lambda: list(records))
+    return records
+
+
+def rebuild(getter):
+    """
+    The same view built from scratch off the stored snapshot. The live
+    (patched) views are put back afterwards, so later applies still
+    patch them.
+    """
+    views, local = dict(cache._views), dict(cache._local)
+    cache._views.clear()
+    cache._local.clear()
+    try:
+        return getter()
+    finally:
+        cache._views.clear()
+        cache._views.update(views)
+        cache._local.clear()
+        cache._local.update(local)
@@ -0,0 +1,123 @@
+"""
+The job index and job lists patched in place (cache.VIEW_PATCHERS) must
+match the same views rebuilt from the stored snapshot.
+"""
+
+import cache
+from conftest import project, rebuild
+
+
+def seed(projects):
+    projects.extend([
+        project('SKY 001', due='2026-10-19'),
+        project('SKY 002', owner='Sam Lee', due='2026-10-20'),
+        project('TOW 003', due='2026-10-21', **{'With Client?': True}),
+        project('TOW 004', owner='Sam Lee', due='2026-10-22'),
+        project('ONE 005', due='2026-10-23'),
+        project('ONE 006', owner='Sam Lee', due=None),
+    ])
+    # Read every patched view so apply_changes has something to carry forward
+    cache.get_active_jobs()
+    cache.get_active_jobs_full()
+    return cache.get_job_index()
+
+
+def assert_rebuilds_equal(index):
+    jobs = cache.get_active_jobs()
+    jobs_full = cache.get_active_jobs_full()
+
+    assert vars(index) == vars(rebuild(cache.get_job_index))
+    assert jobs == rebuild(cache.get_active_jobs)
+    assert jobs_full == rebuild(cache.get_active_jobs_full)
+
+
+def test_patches_in_place(projects):
+    index = seed(projects)
+    cache.apply_project(project('SKY 001', due='2026-10-25'))
+
+    assert cache.get_job_index() is index
+    assert_rebuilds_equal(index)
+
+
+def test_status_leaving_active_set(projects):
+    index = seed(projects)
+    cache.apply_project(project('TOW 004', owner='Sam Lee', due='2026-10-22', status='Completed'))
+
+    assert index.get('TOW 004') is None
+    assert 'TOW 004' not in [j['jobNumber'] for j in index.search(owner='sam')['jobs']]
+    assert not index.search(q='004')['jobs']
+    assert_rebuilds_equal(index)
+
+
+def test_owner_change(projects):
+    index = seed(projects)
+    cache.apply_project(project('SKY 001', owner='Sam Lee', due='2026-10-19'))
+
+    assert 'SKY 001' not in index.by_owner.get('emma', set())
+    assert [j['jobNumber'] for j in index.search(owner='sam')['jobs']][0] == 'SKY 001'
+    assert_rebuilds_equal(index)
+
+
+def test_new_job_and_new_tokens(projects):
+    index = seed(projects)
+    cache.apply_project(project('NEW 007', due='2026-10-20', Description='Winter launch'))
+
+    assert [j['jobNumber'] for j in index.search(q='wint')['jobs']] == ['NEW 007']
+    assert_rebuilds_equal(index)
+
+
+def test_due_before_paging_across_apply(projects):
+    index = seed(projects)
+
+    first = index.search(due_before='2026-10-23', limit=2)
+    assert [j['jobNumber'] for j in first['jobs']] == ['SKY 001', 'SKY 002']
+
+    # One job moves behind the cursor, one moves into the window ahead of it
+    cache.apply_project(project('TOW 003', due='2026-10-18', **{'With Client?': True}))
+    cache.apply_project(project('ONE 005', due='2026-10-21'))
+
+    fresh = rebuild(cache.get_job_index)
+    for kwargs in ({}, {'with_client': False}, {'owner': 'emma'}):
+        patched = index.search(due_before='2026-10-23', cursor=first['nextCursor'], limit=2, **kwargs)
+        assert patched == fresh.search(due_before='2026-10-23', cursor=first['nextCursor'], limit=2, **kwargs)
+
+    second = index.search(due_before='2026-10-23', cursor=first['nextCursor'], limit=2)
+    assert [j['jobNumber'] for j in second['jobs']] == ['ONE 005', 'TOW 004']
+    assert second['nextCursor'] is None
+
+
+def test_refresh_keeps_changes_applied_mid_fetch(projects, monkeypatch):
+    index = seed(projects)
+    moved = project('SKY 001', due='2026-10-30')
+
+    def fetch_during_write():
+        fetched = list(projects)
+        if projects[0] != moved:
+            # Saved (and written to the store) while this read was in flight
+            projects[0] = moved
+            cache.apply_project(moved)
+        return fetched
+
+    monkeypatch.setitem(cache.SNAPSHOTS, 'projects', fetch_during_write)
+    cache.refresh('projects')
+
+    assert cache.get_job_index().get('SKY 001')['updateDue'] == '2026-10-30'
+    assert rebuild(cache.get_job_index).get('SKY 001')['updateDue'] == '2026-10-30'
+    assert index.get('SKY 001')['updateDue'] == '2026-10-30'
+
+
+def test_refresh_gives_up_while_changes_keep_landing(projects, monkeypatch):
+    seed(projects)
+    dues = iter(f'2026-11-{day:02d}' for day in range(1, 10))
+
+    def fetch_during_writes():
+        fetched = list(projects)
+        cache.apply_project(project('SKY 001', due=next(dues)))
+        return fetched
+
+    monkeypatch.setitem(cache.SNAPSHOTS, 'projects', fetch_during_writes)
+    cache.refresh('projects')
+
+    # The last applied change stands; the stale reads were all dropped
+    last = f'2026-11-{cache.REPLACE_ATTEMPTS:02d}'
+    assert rebuild(cache.get_job_index).get('SKY 001')['updateDue'] == last
@@ -0,0 +1,97 @@
+"""
+The To Do view patched in place (cache.VIEW_PATCHERS) must match the
+same view rebuilt from the stored snapshot, and roll over at real NZ
+midnight.
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+import cache
+import todo
+from conftest import project, rebuild
+
+TODAY = '2026-10-19'     # Monday
+NEXT_DAY = '2026-10-20'
+LATER = '2026-10-27'
+
+
+@pytest.fixture(autouse=True)
+def fixed_day(monkeypatch):
+    monkeypatch.setattr(todo, 'nz_dates', lambda: (date(2026, 10, 19), date(2026, 10, 20), 'Tomorrow'))
+
+
+def seed(projects):
+    projects.extend([
+        project('SKY 001', due=TODAY),
+        project('SKY 002', owner='Sam Lee', due='2026-10-15'),
+        project('TOW 003', due=NEXT_DAY),
+        project('TOW 004', owner='Sam Lee', due=NEXT_DAY),
+        project('ONE 005', due=LATER),
+        project('ONE 006', due=TODAY, **{'With Client?': True}),
+    ])
+    return cache.get_todo_view()
+
+
+def numbers(buckets):
+    return {name: [j['jobNumber'] for j in jobs] for name, jobs in buckets.items()}
+
+
+def assert_rebuilds_equal(view):
+    fresh = rebuild(cache.get_todo_view)
+    for owner in ('', 'emma', 'emma moore', 'sam', 'sam lee', 'nobody'):
+        assert view.lookup(owner) == fresh.lookup(owner), owner
+
+
+def test_update_due_moves_between_buckets(projects):
+    view = seed(projects)
+
+    cache.apply_project(project('SKY 001', due=NEXT_DAY))
+    assert cache.get_todo_view() is view
+    assert numbers(view.lookup('emma')) == {'today': [], 'next': ['SKY 001', 'TOW 003']}
+    assert_rebuilds_equal(view)
+
+    cache.apply_project(project('SKY 001', due=LATER))
+    assert numbers(view.lookup('emma')) == {'today': [], 'next': ['TOW 003']}
+    assert_rebuilds_equal(view)
+
+    cache.apply_project(project('ONE 005', due='2026-10-01'))
+    assert numbers(view.lookup()) == {'today': ['ONE 005', 'SKY 002'], 'next': ['TOW 003', 'TOW 004']}
+    assert_rebuilds_equal(view)
+
+
+def test_owner_change(projects):
+    view = seed(projects)
+    cache.apply_project(project('TOW 003', owner='Sam Lee', due=NEXT_DAY))
+
+    assert numbers(view.lookup('emma')) == {'today': ['SKY 001'], 'next': []}
+    assert numbers(view.lookup('sam')) == {'today': ['SKY 002'], 'next': ['TOW 003', 'TOW 004']}
+    assert_rebuilds_equal(view)
+
+
+def test_status_leaving_active_set(projects):
+    view = seed(projects)
+    cache.apply_project(project('SKY 002', owner='Sam Lee', due='2026-10-15', status='Completed'))
+
+    assert numbers(view.lookup('sam')) == {'today': [], 'next': ['TOW 004']}
+    assert_rebuilds_equal(view)
+
+
+def test_with_client_toggle(projects):
+    view = seed(projects)
+    cache.apply_project(project('ONE 006', due=TODAY))
+    cache.apply_project(project('SKY 001', due=TODAY, **{'With Client?': True}))
+
+    assert numbers(view.lookup('emma'))['today'] == ['ONE 006']
+    assert_rebuilds_equal(view)
+
+
+@pytest.mark.parametrize('day, hours', [
+    (date(2026, 9, 27), 23),   # Daylight saving starts
+    (date(2026, 4, 5), 25),    # ...and ends
+    (date(2026, 10, 19), 24),
+])
+def test_seconds_until_nz_midnight_across_daylight_saving(day, hours):
+    now = datetime.combine(day, datetime.min.time(), tzinfo=todo.NZ_TZ)
+    assert todo.seconds_until_nz_midnight(now) == hours * 3600
@@ -0,0 +1,160 @@
+"""
+Dot App - To Do View
+Materialised today / next-workday job buckets, overall and per owner.
+
+Built once per snapshot version (see cache.get_todo_view), patched in
+place when a job changes, and rebuilt when the NZ day rolls over.
+"""
+
+import os
+import time
+import threading
+from bisect import insort
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import airtable
+from search import owner_keys
+
+NZ_TZ = ZoneInfo('Pacific/Auckland')
+ALL = ''  # Bucket key for everyone's jobs
+
+# ==================== 
+# NZ Dates (memoised per day)
+# ==================== 
+
+_dates = {'expires': 0, 'value': None}
+
+
+def seconds_until_nz_midnight(now=None):
+    now = now or datetime.now(NZ_TZ)
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=NZ_TZ)
+    # Same-zone subtraction is wall-clock time - wrong on daylight saving days
+    return max(1.0, midnight.timestamp() - now.timestamp())
+
+
+def nz_dates():
+    """(today, next workday, next label) - recomputed only after NZ midnight."""
+    if time.time() >= _dates['expires']:
+        today = airtable.get_nz_today()
+        next_day, label = airtable.get_next_workday()
+        _dates['value'] = (today, next_day, label)
+        _dates['expires'] = time.time() + seconds_until_nz_midnight()
+    return _dates['value']
+
+
+def due_bucket(job, today, next_day):
+    """'today', 'next' or None - same rules as airtable.get_todo_jobs."""
+    if job.get('withClient'):
+        return None
+
+    update_due = job.get('updateDue')
+    if not update_due:
+        return None
+
+    try:
+        due_date = datetime.strptime(update_due, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+    if due_date <= today:
+        return 'today'
+    if due_date == next_day:
+        return 'next'
+    return None
+
+
+# ==================== 
+# View
+# ==================== 
+
+class TodoView:
+    """
+    Jobs due today (or overdue) and on the next workday, bucketed by owner.
+    Each bucket is kept sorted by (updateDue, jobNumber), so a lookup is
+    a dict access plus the copy out.
+    """
+
+    def __init__(self, jobs):
+        self.day, self.next_day, self.next_label = nz_dates()
+        self.buckets = {ALL: {'today': [], 'next': []}}
+        self.placed = {}  # jobNumber -> (bucket, [owner keys])
+
+        for job in jobs:
+            self._add(job, keep_sorted=False)
+
+        # Entries compare on (updateDue, jobNumber) - numbers are unique
+        for owner in self.buckets.values():
+            owner['today'].sort()
+            owner['next'].sort()
+
+    def _add(self, job, keep_sorted=True):
+        number = job.get('jobNumber')
+        bucket = due_bucket(job, self.day, self.next_day)
+        if not number or not bucket or number in self.placed:
+            return
+
+        keys = [ALL] + owner_keys(job.get('projectOwner'))
+        entry = (job['updateDue'], number, job)
+
+        for key in keys:
+            entries = self.buckets.setdefault(key, {'today': [], 'next': []})[bucket]
+            if keep_sorted:
+                insort(entries, entry)
+            else:
+                entries.append(entry)
+
+        self.placed[number] = (bucket, keys)
+
+    def remove(self, job_number):
+        placed = self.placed.pop(job_number, None)
+        if not placed:
+            return
+
+        bucket, keys = placed
+        for key in keys:
+            entries = self.buckets[key][bucket]
+            entries[:] = [e for e in entries if e[1] != job_number]
+
+    def apply(self, job):
+        """Re-bucket a single changed job."""
+        self.remove(job.get('jobNumber'))
+        self._add(job)
+
+    def lookup(self, owner=''):
+        """{'today': [...], 'next': [...]} for an owner (full or first name), or everyone."""
+        owner = (owner or '').strip().lower()
+        buckets = self.buckets.get(owner) or {'today': [], 'next': []}
+        return {
+            'today': [e[2] for e in buckets['today']],
+            'next': [e[2] for e in buckets['next']],
+        }
+
+
+# ==================== 
+# Day Boundary
+# ==================== 
+
+_scheduler_pid = None
+
+
+def start_scheduler(rebuild):
+    """
+    Call rebuild() just after each Pacific/Auckland midnight so the first
+    request of the day doesn't pay for re-bucketing. Once per process.
+    """
+    global _scheduler_pid
+    if _scheduler_pid == os.getpid():
+        return
+    _scheduler_pid = os.getpid()
+
+    def run():
+        while True:
+            time.sleep(seconds_until_nz_midnight() + 1)
+            try:
+                rebuild()
+                print('[Todo] Rebuilt for new NZ day')
+            except Exception as e:
+                print(f'[Todo] Midnight rebuild failed: {e}')
+
+    threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,178 @@
+"""
+Dot App - Asset Build
+Fingerprint, precompress and optimise static/ into static/dist/.
+
+Every asset is copied to static/dist/ under a content-hashed name
+(app.js -> app.3f9c2a1b7d.js) so it can be cached forever. References in
+styles.css (url(...)), manifest.json and index.html are rewritten to the
+hashed names, and the service worker gets the app shell list to precache.
+
+Text assets get .gz (and .br, if the brotli package is installed)
+siblings; PNGs are re-encoded smaller and given a .webp sibling if
+Pillow is installed. The app serves whichever the browser accepts.
+
+Usage:
+    python tools/build_assets.py          # run from the repo root (Procfile does this)
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR = os.path.join(ROOT, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_FILE = 'assets.json'
+
+HASH_LENGTH = 10
+COMPRESSIBLE = {'.js', '.css', '.json', '.html', '.svg'}
+MIN_COMPRESS_BYTES = 512
+
+# Built in dependency order: a file is hashed after the files it references
+TEXT_ASSETS = ['styles.css', 'app.js', 'manifest.json']
+SHELL_PAGE = 'index.html'
+SERVICE_WORKER = 'sw.js'
+
+REF_RE = re.compile(r'/static/([A-Za-z0-9_./-]+\.[A-Za-z0-9]+)')
+
+
+# ==================== 
+# Helpers
+# ==================== 
+
+def url_for(path):
+    return f'/static/{path}'
+
+
+def fingerprint(path, content):
+    """images/Robot.png + bytes -> images/Robot.1a2b3c4d5e.png"""
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    stem, ext = os.path.splitext(path)
+    return f'{stem}.{digest}{ext}'
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def rewrite(text, mapping):
+    """Swap /static/... references for their fingerprinted URLs."""
+    return REF_RE.sub(lambda m: mapping.get(url_for(m.group(1)), m.group(0)), text)
+
+
+def precompress(path, content):
+    """Write .gz (and .br) siblings for text assets worth compressing."""
+    if os.path.splitext(path)[1] not in COMPRESSIBLE or len(content) < MIN_COMPRESS_BYTES:
+        return
+    write(path + '.gz', gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli:
+        write(path + '.br', brotli.compress(content, quality=11))
+
+
+def optimise_image(path, content):
+    """Re-encode a PNG smaller and add a WebP sibling. No-op without Pillow."""
+    if not Image or not path.lower().endswith('.png'):
+        return content
+
+    from io import BytesIO
+
+    with Image.open(BytesIO(content)) as image:
+        image.load()
+
+        out = BytesIO()
+        image.save(out, 'PNG', optimize=True)
+        if out.tell() < len(content):
+            content = out.getvalue()
+
+        webp = BytesIO()
+        image.save(webp, 'WEBP', quality=85, method=6)
+        if webp.tell() < len(content):
+            write(path + '.webp', webp.getvalue())
+
+    return content
+
+
+# ==================== 
+# Build
+# ==================== 
+
+def build():
+    # Build beside the live dist/ and swap at the end, so a failed build
+    # leaves the previous one (or none) in place rather than half a tree
+    staging = DIST_DIR + '.tmp'
+    if os.path.isdir(staging):
+        shutil.rmtree(staging)
+
+    mapping = {}  # /static/images/Robot.png -> /static/dist/images/Robot.<hash>.png
+
+    def emit(path, content):
+        hashed = fingerprint(path, content)
+        target = os.path.join(staging, hashed)
+        content = optimise_image(target, content)
+        write(target, content)
+        precompress(target, content)
+        mapping[url_for(path)] = url_for(f'dist/{hashed}')
+
+    # Images first - the text assets point at them
+    for folder, _dirs, files in os.walk(os.path.join(STATIC_DIR, 'images')):
+        for name in sorted(files):
+            full = os.path.join(folder, name)
+            with open(full, 'rb') as f:
+                emit(os.path.relpath(full, STATIC_DIR).replace(os.sep, '/'), f.read())
+
+    for path in TEXT_ASSETS:
+        with open(os.path.join(STATIC_DIR, path), encoding='utf-8') as f:
+            emit(path, rewrite(f.read(), mapping).encode('utf-8'))
+
+    # The shell page and service worker keep stable URLs (served no-cache)
+    with open(os.path.join(STATIC_DIR, SHELL_PAGE), encoding='utf-8') as f:
+        page = rewrite(f.read(), mapping).encode('utf-8')
+    write(os.path.join(staging, SHELL_PAGE), page)
+    precompress(os.path.join(staging, SHELL_PAGE), page)
+
+    version = hashlib.sha256(json.dumps(mapping, sort_keys=True).encode('utf-8') + page).hexdigest()[:HASH_LENGTH]
+    shell = ['/'] + sorted(mapping.values())
+
+    with open(os.path.join(STATIC_DIR, SERVICE_WORKER), encoding='utf-8') as f:
+        worker = f.read()
+    worker = worker.replace("const VERSION = 'dev';", f"const VERSION = '{version}';")
+    worker = worker.replace('const PRECACHE = [];', f'const PRECACHE = {json.dumps(shell, indent=4)};')
+    write(os.path.join(staging, SERVICE_WORKER), worker.encode('utf-8'))
+
+    write(os.path.join(staging, MANIFEST_FILE), json.dumps({
+        'version': version,
+        'assets': mapping
+    }, indent=2, sort_keys=True).encode('utf-8'))
+
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.rename(staging, DIST_DIR)
+
+    extras = [name for name, module in (('brotli', brotli), ('Pillow', Image)) if not module]
+    print(f"[Assets] Built {len(mapping)} assets (version {version})"
+          + (f" - without {', '.join(extras)}" if extras else ''))
+
+
+if __name__ == '__main__':
+    try:
+        build()
+    except Exception as e:
+        # Never block a deploy - the app falls back to serving static/ directly
+        print(f'[Assets] Build failed, serving unbuilt assets: {e}')
+    sys.exit(0)
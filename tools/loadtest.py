@@ -0,0 +1,475 @@
+"""
+Dot App - Load Test
+Replay captured traffic against a local app backed by fake upstreams.
+
+1. Capture real usage (see recorder.py):
+       RECORD_REQUESTS=traffic.jsonl gunicorn app:app -c gunicorn.conf.py
+2. Replay it, here 4x faster, with each captured user doubled:
+       python tools/loadtest.py traffic.jsonl --speed 4 --copies 2
+
+tools/fixtures/traffic_example.jsonl is a short two-user capture to try it on.
+
+The tool starts a fake Airtable + Brain + Teams proxy (with configurable
+latency), spawns the app under gunicorn pointed at it, logs each captured
+user in, and re-issues their requests on the captured timeline. Hashed
+job numbers map onto the fake jobs; sanitised text is refilled to the
+captured length.
+
+Reports throughput, latency percentiles and upstream calls per request
+for each route (from the app's X-Upstream-Calls header), plus the total
+calls the fakes saw.
+
+    python tools/loadtest.py --backend-only     # just the fakes, on --backend-port
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PINS = '9871,9262,1919'
+SKIP_ENDPOINTS = {'auth_pin', 'logout'}  # The tool logs users in itself
+SKIP_PARAMS = {'cursor'}                 # Cursors don't survive a replay
+FILLER = 'summer banner campaign video social launch brief '
+
+CLIENTS = ['SKY', 'ONE', 'TOW', 'FIS', 'HUN']
+OWNERS = ['Michael Goldthorpe', 'Emma Moore']
+STAGES = ['Triage', 'Clarify', 'Build', 'Wrap']
+STATUSES = ['Incoming', 'In Progress', 'On Hold', 'Completed', 'Archived']
+
+
+# ==================== 
+# Fake Upstreams
+# ==================== 
+
+class FakeBackend:
+    """In-memory Airtable base plus Brain and Teams proxy stand-ins."""
+
+    def __init__(self, jobs=200, airtable_latency=0.15, brain_latency=1.5, seed=1):
+        rnd = random.Random(seed)
+        self.airtable_latency = airtable_latency
+        self.brain_latency = brain_latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+        projects = []
+        for i in range(jobs):
+            client = CLIENTS[i % len(CLIENTS)]
+            projects.append({'id': f'recP{i:05d}', 'createdTime': '2026-01-01T00:00:00.000Z', 'fields': {
+                'Job Number': f'{client} {i:03d}',
+                'Project Name': f'{client} {FILLER.split()[i % 7].title()} project',
+                'Status': STATUSES[0] if i % 10 == 0 else rnd.choice(STATUSES[:3] * 3 + STATUSES[3:]),
+                'Stage': rnd.choice(STAGES),
+                'Project Owner': OWNERS[i % len(OWNERS)],
+                'Description': FILLER.strip(),
+                'Update Due': f'2026-{rnd.randint(9, 12):02d}-{rnd.randint(1, 28):02d}',
+                'With Client?': rnd.random() < 0.2,
+                'Update History': '\n'.join(f'0{d}/10 - update {d}' for d in range(1, 6)),
+            }})
+
+        self.tables = {
+            'Projects': projects,
+            'Clients': [{'id': f'recC{i}', 'fields': {
+                'Client code': code, 'Clients': code.title(), 'Monthly Committed': 10000, 'Rollover': 0,
+            }} for i, code in enumerate(CLIENTS)],
+            'Meetings': [],
+            'Tracker': [{'id': f'recT{i:05d}', 'fields': {
+                'Client Code': [CLIENTS[i % len(CLIENTS)]],
+                'Job Number': [projects[i % jobs]['fields']['Job Number']],
+                'Spend': rnd.randint(1, 50) * 100,
+                'Month': rnd.choice(['September', 'October', 'November']),
+            }} for i in range(jobs * 2)],
+            'Updates': [],
+        }
+
+    def count(self, kind):
+        with self.lock:
+            self.calls[kind] += 1
+
+    @property
+    def job_numbers(self):
+        return [r['fields']['Job Number'] for r in self.tables['Projects']]
+
+    def query(self, table, formula):
+        rows = self.tables.get(table, [])
+        if not formula:
+            return rows
+
+        ids = re.findall(r"RECORD_ID\(\) = '([^']+)'", formula)
+        if ids:
+            return [r for r in rows if r['id'] in ids]
+
+        if table == 'Updates':
+            match = re.search(r"FIND\(', ([^']+), ', ', ' & ARRAYJOIN", formula)
+            ids = {r['id'] for r in self.tables['Projects'] if match and r['fields']['Job Number'] == match.group(1)}
+            return [r for r in rows if set(r['fields'].get('Project Link', [])) & ids]
+
+        statuses = re.findall(r"\{Status\} = '([^']+)'", formula)
+        if statuses:
+            rows = [r for r in rows if r['fields'].get('Status') in statuses]
+
+        for field, value in re.findall(r"\{(Job Number|Client Code)\} = '([^']+)'", formula):
+            rows = [r for r in rows if value in (r['fields'].get(field) if isinstance(r['fields'].get(field), list)
+                                                 else [r['fields'].get(field)])]
+
+        prefix = re.search(r"FIND\('([^']+)', \{Job Number\}\)=1", formula)
+        if prefix:
+            rows = [r for r in rows if r['fields'].get('Job Number', '').startswith(prefix.group(1))]
+
+        return rows
+
+
+def make_handler(backend):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def send_json(self, data, status=200):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def read_json(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'{}')
+
+        def airtable_path(self):
+            parts = [unquote(p) for p in urlparse(self.path).path.strip('/').split('/')]
+            return parts[2] if len(parts) > 2 else '', parts[3] if len(parts) > 3 else None
+
+        def do_GET(self):
+            backend.count('airtable')
+            time.sleep(backend.airtable_latency)
+
+            table, record_id = self.airtable_path()
+            if record_id:
+                match = [r for r in backend.tables.get(table, []) if r['id'] == record_id]
+                return self.send_json(match[0]) if match else self.send_json({'error': 'NOT_FOUND'}, 404)
+
+            query = parse_qs(urlparse(self.path).query)
+            rows = backend.query(table, query.get('filterByFormula', [''])[0])
+            offset = int(query.get('offset', ['0'])[0])
+            size = int(query.get('pageSize', ['100'])[0])
+
+            data = {'records': rows[offset:offset + size]}
+            if offset + size < len(rows):
+                data['offset'] = str(offset + size)
+            self.send_json(data)
+
+        def do_PATCH(self):
+            backend.count('airtable')
+            time.sleep(backend.airtable_latency)
+
+            table, record_id = self.airtable_path()
+            fields = self.read_json().get('fields', {})
+            for record in backend.tables.get(table, []):
+                if record['id'] == record_id:
+                    with backend.lock:
+                        record['fields'].update(fields)
+                    return self.send_json(record)
+            self.send_json({'error': 'NOT_FOUND'}, 404)
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            data = self.read_json()
+
+            if path == '/hub':
+                backend.count('brain')
+                time.sleep(backend.brain_latency)
+                return self.send_json({'type': 'answer', 'message': FILLER.strip(), 'jobs': None})
+
+            if path.startswith('/proxy/'):
+                backend.count('proxy')
+                return self.send_json({'success': True})
+
+            backend.count('airtable')
+            time.sleep(backend.airtable_latency)
+            table, _ = self.airtable_path()
+            with backend.lock:
+                backend.next_id += 1
+                record = {'id': f'recN{backend.next_id:05d}', 'createdTime': '2026-10-01T00:00:00.000Z',
+                          'fields': data.get('fields', {})}
+                backend.tables.setdefault(table, []).append(record)
+            self.send_json(record)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_backend(backend, port):
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(backend))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ==================== 
+# App Under Test
+# ==================== 
+
+def spawn_app(port, backend_url, workers):
+    """Start the app under gunicorn against the fakes; returns the process once ready."""
+    scratch = tempfile.mkdtemp(prefix='dot-loadtest-')
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        WEB_CONCURRENCY=str(workers),
+        AIRTABLE_API_URL=backend_url,
+        BRAIN_URL=backend_url,
+        PROXY_URL=backend_url,
+        CACHE_DB=os.path.join(scratch, 'cache.sqlite3'),
+        EVENTS_DIR=os.path.join(scratch, 'events'),
+        UPSTREAM_CALLS_HEADER='1',
+        RECORD_REQUESTS='',
+        AIRTABLE_WEBHOOK_ID='',
+    )
+    log = open(os.path.join(scratch, 'app.log'), 'w')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '-c', 'gunicorn.conf.py'],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'App exited early - see {log.name}')
+        try:
+            if requests.get(f'http://127.0.0.1:{port}/health/ready', timeout=2).ok:
+                print(f'[Loadtest] App ready on :{port} ({workers} workers, log {log.name})')
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+
+    process.terminate()
+    raise RuntimeError(f'App not ready after 60s - see {log.name}')
+
+
+# ==================== 
+# Replay
+# ==================== 
+
+def load_capture(path):
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    entries = [e for e in entries if e.get('endpoint') not in SKIP_ENDPOINTS]
+    entries.sort(key=lambda e: e['ts'])
+    return entries
+
+
+def fill(shape, session_id=None):
+    """Rebuild a value from its recorded shape ('str:12' -> 12 chars of filler)."""
+    if isinstance(shape, dict):
+        return {k: session_id if k == 'sessionId' else fill(v) for k, v in shape.items()}
+    if not isinstance(shape, str):
+        return shape
+    kind, _, size = shape.partition(':')
+    if kind == 'str':
+        n = int(size or 0)
+        return (FILLER * (n // len(FILLER) + 1))[:n].strip() or 'a'
+    if kind == 'list':
+        return []
+    return {'num': 1, 'bool': False, 'null': None}.get(kind, shape)
+
+
+class Client:
+    """One replayed user: a logged-in session plus their chat session ID."""
+
+    def __init__(self, app_url, pin):
+        self.http = requests.Session()
+        self.http.post(f'{app_url}/auth/pin', json={'pin': pin}, timeout=10)
+        self.chat_session = None
+
+
+def build_request(entry, job_numbers, chat_session):
+    def job_for(key):
+        return job_numbers[int(key, 16) % len(job_numbers)]
+
+    path = re.sub(r'<(?:[^:>]+:)?([^>]+)>', lambda m: job_for(entry['args'].get(m.group(1), '0')), entry['route'])
+    params = {k: fill(v) for k, v in (entry.get('params') or {}).items() if k not in SKIP_PARAMS}
+    body = entry.get('body')
+    if isinstance(body, dict):
+        body = {k: v if not isinstance(v, str) or not re.match(r'^(str|num|bool|null|list):?', v) else fill(v)
+                for k, v in body.items()}
+        if 'sessionId' in body:
+            body['sessionId'] = chat_session
+    return path, params, body
+
+
+def replay(entries, app_url, speed, copies, pins, job_numbers, concurrency):
+    pins = pins.split(',')
+    users = sorted({e.get('user') or '' for e in entries})
+    clients = {}
+    for copy in range(copies):
+        for i, user in enumerate(users):
+            clients[(copy, user)] = Client(app_url, pins[(copy * len(users) + i) % len(pins)])
+
+    t0 = entries[0]['ts']
+    schedule = sorted(
+        ((e['ts'] - t0) / speed + copy * 0.05, copy, n, e)
+        for copy in range(copies) for n, e in enumerate(entries)
+    )
+
+    results = []
+    lock = threading.Lock()
+
+    def run(entry, client):
+        path, params, body = build_request(entry, job_numbers, client.chat_session)
+        start = time.perf_counter()
+        try:
+            response = client.http.request(entry['method'], app_url + path, params=params,
+                                           json=body if entry['method'] != 'GET' else None, timeout=60)
+            status = response.status_code
+            upstream = response.headers.get('X-Upstream-Calls')
+            if entry['endpoint'] == 'chat' and response.ok:
+                client.chat_session = response.json().get('sessionId') or client.chat_session
+        except requests.RequestException:
+            status, upstream = 0, None
+        elapsed = (time.perf_counter() - start) * 1000
+
+        with lock:
+            results.append({
+                'route': f"{entry['method']} {entry['route']}",
+                'status': status,
+                'ms': elapsed,
+                'upstream': int(upstream) if upstream is not None else None,
+                'captured_ms': entry.get('ms'),
+            })
+
+    print(f'[Loadtest] Replaying {len(schedule)} requests from {len(clients)} users at {speed}x')
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for due, copy, _n, entry in schedule:
+            delay = due - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, entry, clients[(copy, entry.get('user') or '')])
+
+    return results, time.perf_counter() - started
+
+
+# ==================== 
+# Report
+# ==================== 
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]  # Nearest rank
+
+
+def report(results, wall, backend):
+    by_route = defaultdict(list)
+    for result in results:
+        by_route[result['route']].append(result)
+
+    header = f"{'route':44} {'n':>5} {'rps':>6} {'err%':>5} {'p50':>7} {'p95':>7} {'p99':>7} {'up/req':>6} {'cap p95':>7}"
+    print()
+    print(header)
+    print('-' * len(header))
+
+    for route in sorted(by_route, key=lambda r: -len(by_route[r])):
+        rows = by_route[route]
+        ms = [r['ms'] for r in rows]
+        errors = sum(1 for r in rows if not 200 <= r['status'] < 400)
+        upstream = [r['upstream'] for r in rows if r['upstream'] is not None]
+        captured = [r['captured_ms'] for r in rows if r['captured_ms'] is not None]
+        print(f"{route[:44]:44} {len(rows):5d} {len(rows) / wall:6.1f} {100 * errors / len(rows):5.1f} "
+              f"{percentile(ms, 50):7.0f} {percentile(ms, 95):7.0f} {percentile(ms, 99):7.0f} "
+              f"{(sum(upstream) / len(upstream)) if upstream else 0:6.2f} "
+              f"{percentile(captured, 95) if captured else 0:7.0f}")
+
+    all_ms = [r['ms'] for r in results]
+    statuses = Counter(r['status'] for r in results)
+    print('-' * len(header))
+    print(f'[Loadtest] {len(results)} requests in {wall:.1f}s = {len(results) / wall:.1f} req/s; '
+          f'p50 {percentile(all_ms, 50):.0f}ms p95 {percentile(all_ms, 95):.0f}ms p99 {percentile(all_ms, 99):.0f}ms')
+    print(f'[Loadtest] Statuses: {dict(sorted(statuses.items()))}')
+    if backend:
+        total = sum(backend.calls.values())
+        print(f'[Loadtest] Upstream calls: {dict(backend.calls)} = {total / max(1, len(results)):.2f} per request '
+              '(includes background refreshes)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay captured traffic against a local app with fake upstreams.')
+    parser.add_argument('capture', nargs='?', help='JSONL written by the recorder (RECORD_REQUESTS)')
+    parser.add_argument('--speed', type=float, default=1.0, help='replay speed multiplier (1 = real time)')
+    parser.add_argument('--copies', type=int, default=1, help='replay each captured user this many times '
+                        '(users beyond the PINs share a login, and its admission limits)')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers for the spawned app')
+    parser.add_argument('--app', help='target an already running app instead of spawning one')
+    parser.add_argument('--port', type=int, default=5098, help='port for the spawned app')
+    parser.add_argument('--backend-port', type=int, default=5097, help='port for the fake upstreams')
+    parser.add_argument('--backend-only', action='store_true', help='just run the fake upstreams')
+    parser.add_argument('--jobs', type=int, default=200, help='jobs in the fake Projects table')
+    parser.add_argument('--airtable-latency', type=float, default=0.15, help='seconds per fake Airtable call')
+    parser.add_argument('--brain-latency', type=float, default=1.5, help='seconds per fake Brain call')
+    parser.add_argument('--pins', default=DEFAULT_PINS, help='PINs to log replayed users in with')
+    parser.add_argument('--concurrency', type=int, default=64, help='max requests in flight from the tool')
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.jobs, args.airtable_latency, args.brain_latency)
+    server = start_backend(backend, args.backend_port)
+    backend_url = f'http://127.0.0.1:{args.backend_port}'
+    print(f'[Loadtest] Fake Airtable/Brain/proxy on {backend_url}')
+
+    if args.backend_only:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return 0
+
+    if not args.capture:
+        parser.error('a capture file is required (or --backend-only)')
+
+    entries = load_capture(args.capture)
+    if not entries:
+        print('[Loadtest] Capture is empty')
+        return 1
+
+    process = None
+    app_url = args.app
+    if not app_url:
+        process = spawn_app(args.port, backend_url, args.workers)
+        app_url = f'http://127.0.0.1:{args.port}'
+
+    try:
+        backend.calls.clear()
+        results, wall = replay(entries, app_url.rstrip('/'), args.speed, args.copies,
+                               args.pins, backend.job_numbers, args.concurrency)
+        report(results, wall, backend)
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=30)
+        server.shutdown()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
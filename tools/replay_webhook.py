@@ -0,0 +1,193 @@
+"""
+Dot App - Webhook Replay
+Exercise the Airtable webhook path locally, without Airtable.
+
+Serves a stand-in Airtable API (schema, webhook payloads and refresh, records)
+from a fixture file, then sends signed pings to a running app so it
+pulls and applies the payloads exactly as it would in production.
+
+Usage:
+    # 1. Run the app against the stand-in
+    AIRTABLE_API_URL=http://127.0.0.1:5099 \\
+    AIRTABLE_WEBHOOK_ID=achReplay \\
+    AIRTABLE_WEBHOOK_SECRET=cmVwbGF5LXNlY3JldA== \\
+    python app.py
+
+    # 2. Replay
+    python tools/replay_webhook.py tools/fixtures/webhook_example.json
+
+Fixture format (see tools/fixtures/webhook_example.json):
+    tables:   {tableId: tableName}
+    records:  {tableName: [raw Airtable records]}  - served for reads
+    payloads: [webhook payloads, oldest first]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hmac
+import base64
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+DEFAULT_SECRET = 'cmVwbGF5LXNlY3JldA=='  # base64('replay-secret')
+PAGE_SIZE = 100
+
+
+# ==================== 
+# Stand-in Airtable
+# ==================== 
+
+def make_handler(fixture, state, page_size, webhook_id):
+    tables = fixture.get('tables', {})
+    records = fixture.get('records', {})
+    payloads = fixture.get('payloads', [])
+
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, data, status=200):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            parts = [unquote(p) for p in url.path.strip('/').split('/')]
+
+            # /v0/meta/bases/{base}/tables
+            if parts[1:3] == ['meta', 'bases']:
+                return self.send_json({'tables': [{'id': tid, 'name': name} for tid, name in tables.items()]})
+
+            # /v0/bases/{base}/webhooks - what the keep-alive checks
+            if parts[1:2] == ['bases'] and parts[-1] == 'webhooks':
+                return self.send_json({'webhooks': [{
+                    'id': webhook_id, 'isHookEnabled': True, 'areNotificationsEnabled': True,
+                    'expirationTime': state['expires'],
+                }]})
+
+            # /v0/bases/{base}/webhooks/{id}/payloads
+            if parts[1:2] == ['bases'] and parts[-1] == 'payloads':
+                cursor = int(query.get('cursor', ['1'])[0])
+                batch = payloads[cursor - 1:cursor - 1 + page_size]
+                next_cursor = cursor + len(batch)
+                state['cursor'] = next_cursor
+                print(f'[Replay] Served payloads {cursor}..{next_cursor - 1}')
+                return self.send_json({
+                    'payloads': batch,
+                    'cursor': next_cursor,
+                    'mightHaveMore': next_cursor <= len(payloads)
+                })
+
+            # /v0/{base}/{table}
+            if len(parts) == 3:
+                rows = records.get(parts[2], [])
+                formula = query.get('filterByFormula', [''])[0]
+                ids = re.findall(r"RECORD_ID\(\) = '([^']+)'", formula)
+                if ids:
+                    rows = [r for r in rows if r['id'] in ids]
+                    print(f'[Replay] Served {len(rows)} {parts[2]} record(s) by ID')
+
+                # Snapshot reads filter on status, e.g. OR({Status} = 'Incoming', ...)
+                statuses = re.findall(r"\{Status\} = '([^']+)'", formula)
+                if statuses:
+                    rows = [r for r in rows if r.get('fields', {}).get('Status') in statuses]
+
+                offset = int(query.get('offset', ['0'])[0])
+                data = {'records': rows[offset:offset + PAGE_SIZE]}
+                if offset + PAGE_SIZE < len(rows):
+                    data['offset'] = str(offset + PAGE_SIZE)
+                return self.send_json(data)
+
+            self.send_json({'error': 'NOT_FOUND'}, 404)
+
+        def do_POST(self):
+            parts = [unquote(p) for p in urlparse(self.path).path.strip('/').split('/')]
+
+            # /v0/bases/{base}/webhooks/{id}/refresh
+            if parts[1:2] == ['bases'] and parts[-1] == 'refresh':
+                state['expires'] = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(time.time() + 7 * 86400))
+                print('[Replay] Webhook refreshed')
+                return self.send_json({'expirationTime': state['expires']})
+
+            self.send_json({'error': 'NOT_FOUND'}, 404)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+# ==================== 
+# Pings
+# ==================== 
+
+def send_ping(app_url, webhook_id, secret):
+    body = json.dumps({
+        'base': {'id': os.environ.get('AIRTABLE_BASE_ID', 'app8CI7NAZqhQ4G1Y')},
+        'webhook': {'id': webhook_id},
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+    }).encode('utf-8')
+    mac = hmac.new(base64.b64decode(secret), body, hashlib.sha256).hexdigest()
+
+    response = requests.post(
+        f'{app_url}/webhooks/airtable',
+        data=body,
+        headers={'Content-Type': 'application/json', 'X-Airtable-Content-MAC': f'hmac-sha256={mac}'},
+        timeout=10
+    )
+    print(f'[Replay] Ping -> {response.status_code}')
+    return response.ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay Airtable webhook payloads against a local app.')
+    parser.add_argument('fixture', help='JSON fixture with tables, records and payloads')
+    parser.add_argument('--app', default='http://127.0.0.1:5000', help='running app URL')
+    parser.add_argument('--port', type=int, default=5099, help='port for the stand-in Airtable API')
+    parser.add_argument('--webhook-id', default=os.environ.get('AIRTABLE_WEBHOOK_ID', 'achReplay'))
+    parser.add_argument('--secret', default=os.environ.get('AIRTABLE_WEBHOOK_SECRET', DEFAULT_SECRET))
+    parser.add_argument('--batch', type=int, default=1, help='payloads per page (the app follows mightHaveMore)')
+    parser.add_argument('--timeout', type=float, default=15, help='seconds to wait for the app to catch up')
+    args = parser.parse_args()
+
+    with open(args.fixture) as f:
+        fixture = json.load(f)
+
+    total = len(fixture.get('payloads', []))
+    state = {'cursor': 1, 'expires': None}
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(fixture, state, args.batch, args.webhook_id))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f'[Replay] Stand-in Airtable on http://127.0.0.1:{args.port} ({total} payloads)')
+
+    if not send_ping(args.app, args.webhook_id, args.secret):
+        server.shutdown()
+        return 1
+
+    deadline = time.time() + args.timeout
+    while state['cursor'] <= total and time.time() < deadline:
+        time.sleep(0.2)
+
+    # Let the app finish applying the last batch before the stand-in goes away
+    time.sleep(1)
+    server.shutdown()
+
+    if state['cursor'] <= total:
+        print(f"[Replay] App only consumed {state['cursor'] - 1} of {total} payloads")
+        return 1
+
+    print('[Replay] All payloads consumed')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Dot App - Airtable Webhooks
+Push-based cache invalidation.
+
+Airtable only sends a small "something changed" ping; we verify its
+HMAC, then pull the change payloads from the cursor we last saw,
+fetch just the changed records and write them into the shared
+snapshots. The cursor lives in the cache DB so a restart picks up
+where the last worker left off.
+"""
+
+import os
+import hmac
+import base64
+import time
+import hashlib
+import threading
+
+import airtable
+import cache
+import events
+
+# ==================== 
+# Configuration
+# ==================== 
+
+WEBHOOK_ID = os.environ.get('AIRTABLE_WEBHOOK_ID', '')
+WEBHOOK_SECRET = os.environ.get('AIRTABLE_WEBHOOK_SECRET', '')  # macSecretBase64 from webhook creation
+RECORD_BATCH = 50
+KEEPALIVE_SECONDS = 24 * 60 * 60  # Airtable expires webhooks after 7 days without a refresh
+KEEPALIVE_RETRY_SECONDS = 5 * 60
+
+# Airtable table name -> snapshot it feeds
+TABLE_SNAPSHOTS = {
+    'Projects': 'projects',
+    'Clients': 'clients',
+    'Meetings': 'meetings',
+    'Tracker': 'tracker',
+}
+
+
+def get_webhooks_url():
+    return f'{airtable.AIRTABLE_API_URL}/v0/bases/{airtable.AIRTABLE_BASE_ID}/webhooks'
+
+
+def get_payloads_url(webhook_id):
+    return f'{get_webhooks_url()}/{webhook_id}/payloads'
+
+
+# ==================== 
+# Verification
+# ==================== 
+
+def verify_signature(body, header):
+    """
+    Check X-Airtable-Content-MAC: 'hmac-sha256=<hex>' over the raw body,
+    keyed with the base64-decoded webhook secret.
+    """
+    if not WEBHOOK_SECRET or not header or not header.startswith('hmac-sha256='):
+        return False
+
+    try:
+        key = base64.b64decode(WEBHOOK_SECRET)
+    except ValueError:
+        print('[Webhooks] AIRTABLE_WEBHOOK_SECRET is not valid base64')
+        return False
+
+    expected = hmac.new(key, body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, header[len('hmac-sha256='):])
+
+
+# ==================== 
+# Table Names
+# ==================== 
+
+_table_names = {}
+
+
+def get_table_name(table_id):
+    """Map a table ID (tblXXX) to its name via the base schema, cached."""
+    if table_id not in _table_names:
+        url = f'{airtable.AIRTABLE_API_URL}/v0/meta/bases/{airtable.AIRTABLE_BASE_ID}/tables'
+        response = airtable.http.get(url, timeout=airtable.AIRTABLE_TIMEOUT)
+        response.raise_for_status()
+        for table in response.json().get('tables', []):
+            _table_names[table['id']] = table['name']
+
+    return _table_names.get(table_id)
+
+
+# ==================== 
+# Payloads
+# ==================== 
+
+def collect_changes(payloads):
+    """
+    Fold a run of payloads into per-table record IDs.
+    Returns: {table_id: {'changed': set(), 'destroyed': set()}}
+    """
+    changes = {}
+
+    for payload in payloads:
+        for table_id, table in (payload.get('changedTablesById') or {}).items():
+            entry = changes.setdefault(table_id, {'changed': set(), 'destroyed': set()})
+
+            for record_id in list(table.get('createdRecordsById') or {}) + list(table.get('changedRecordsById') or {}):
+                entry['changed'].add(record_id)
+                entry['destroyed'].discard(record_id)
+
+            for record_id in table.get('destroyedRecordIds') or []:
+                entry['destroyed'].add(record_id)
+                entry['changed'].discard(record_id)
+
+    return changes
+
+
+def fetch_records_by_id(table, record_ids):
+    """Fetch just the given records, batched into RECORD_ID() formulas."""
+    record_ids = sorted(record_ids)
+    records = []
+
+    for i in range(0, len(record_ids), RECORD_BATCH):
+        batch = record_ids[i:i + RECORD_BATCH]
+        formula = 'OR(' + ', '.join(f"RECORD_ID() = '{record_id}'" for record_id in batch) + ')'
+        records.extend(airtable.fetch_records(table, {'filterByFormula': formula}))
+
+    return records
+
+
+def apply_table_changes(table, changed_ids, destroyed_ids):
+    """Write one table's changes into its snapshot and notify clients."""
+    snapshot = TABLE_SNAPSHOTS.get(table)
+    if not snapshot:
+        return
+
+    records = fetch_records_by_id(table, changed_ids) if changed_ids else []
+
+    # Changed but not returned = deleted in the meantime
+    deletes = set(destroyed_ids) | (set(changed_ids) - {r['id'] for r in records})
+    upserts = records
+
+    if snapshot == 'projects':
+        # Jobs leaving the active statuses drop out of the snapshot
+        upserts = [r for r in records if r.get('fields', {}).get('Status', 'Incoming') in airtable.ACTIVE_STATUSES]
+        deletes |= {r['id'] for r in records} - {r['id'] for r in upserts}
+
+    cache.apply_changes(snapshot, upserts=upserts, deletes=deletes)
+    print(f'[Webhooks] {table}: {len(upserts)} updated, {len(deletes)} removed')
+
+    if snapshot == 'projects':
+        active_ids = {r['id'] for r in upserts}
+        for record in records:
+            job = cache.list_job(record)
+            events.publish('job', {
+                'jobNumber': job['jobNumber'],
+                'clientCode': job['clientCode'],
+                'job': job if record['id'] in active_ids else None
+            })
+    elif snapshot == 'tracker':
+        clients = {airtable.first_value(r.get('fields', {}).get('Client Code', '')) for r in records}
+        for client in clients or {None}:
+            events.publish('tracker', {'client': client})
+
+
+def process(webhook_id=None):
+    """
+    Pull every payload after the stored cursor and apply it.
+    Serialised across workers so payloads are applied once, in order.
+    """
+    webhook_id = webhook_id or WEBHOOK_ID
+    if not webhook_id:
+        return
+
+    cursor_key = f'webhook_cursor:{webhook_id}'
+    lock = cache.acquire_file_lock(f'{cache.CACHE_LOCK}.webhook')
+
+    try:
+        cursor = cache.get_meta(cursor_key, 1)
+
+        while True:
+            response = airtable.http.get(
+                get_payloads_url(webhook_id),
+                params={'cursor': cursor},
+                timeout=airtable.AIRTABLE_TIMEOUT
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            payloads = data.get('payloads', [])
+            changes = collect_changes(payloads)
+
+            try:
+                tables = {table_id: get_table_name(table_id) for table_id in changes}
+            except Exception as e:
+                # No schema access - fall back to refreshing everything
+                print(f'[Webhooks] Table lookup failed, refreshing all snapshots: {e}')
+                for name in cache.SNAPSHOTS:
+                    cache.refresh(name)
+                tables = {}
+
+            for table_id, entry in changes.items():
+                if tables.get(table_id):
+                    apply_table_changes(tables[table_id], entry['changed'], entry['destroyed'])
+
+            # Only advance once the batch is applied - a crash replays it
+            cursor = data.get('cursor', cursor)
+            cache.set_meta(cursor_key, cursor)
+
+            if not data.get('mightHaveMore'):
+                break
+
+    except Exception as e:
+        print(f'[Webhooks] Processing failed, will retry on next ping: {e}')
+
+    finally:
+        lock.close()
+
+
+# ==================== 
+# Keep-Alive
+# ==================== 
+
+_keepalive = {'next_at': 0}
+
+
+def check_webhook(webhook_id):
+    """
+    Extend the webhook's expiry and confirm it is still enabled and
+    pinging. Returns the new expiration time; raises if it isn't usable.
+    """
+    response = airtable.http.get(get_webhooks_url(), timeout=airtable.AIRTABLE_TIMEOUT)
+    response.raise_for_status()
+    hook = next((h for h in response.json().get('webhooks', []) if h.get('id') == webhook_id), None)
+
+    if hook is None:
+        raise RuntimeError('webhook not found - expired or deleted')
+    if not hook.get('isHookEnabled', True):
+        raise RuntimeError('webhook is disabled')
+    if not hook.get('areNotificationsEnabled', True):
+        raise RuntimeError('pings are off after failed deliveries')
+
+    response = airtable.http.post(f'{get_webhooks_url()}/{webhook_id}/refresh', timeout=airtable.AIRTABLE_TIMEOUT)
+    response.raise_for_status()
+    return response.json().get('expirationTime')
+
+
+def keep_alive():
+    """
+    Refresher task: refresh the webhook daily. While it can't be
+    confirmed, snapshots go back to the short poll interval.
+    """
+    if not WEBHOOK_ID or time.time() < _keepalive['next_at']:
+        return
+
+    try:
+        expires = check_webhook(WEBHOOK_ID)
+        alive = True
+        print(f'[Webhooks] Refreshed {WEBHOOK_ID}, expires {expires}')
+    except Exception as e:
+        alive = False
+        print(f'[Webhooks] Keep-alive failed, polling every {cache.REFRESH_SECONDS}s: {e}')
+
+    cache.set_meta(cache.webhook_alive_key(WEBHOOK_ID), alive)
+    _keepalive['next_at'] = time.time() + (KEEPALIVE_SECONDS if alive else KEEPALIVE_RETRY_SECONDS)
+
+
+def notify(webhook_id):
+    """Handle a verified ping without holding up Airtable's request."""
+    if WEBHOOK_ID and webhook_id != WEBHOOK_ID:
+        print(f'[Webhooks] Ignoring ping for unknown webhook {webhook_id}')
+        return
+
+    threading.Thread(target=process, args=(webhook_id,), daemon=True).start()
+
+
+def catch_up():
+    """
+    Apply anything that arrived while no worker was running, and have
+    whichever worker is the refresher keep the webhook alive.
+    """
+    if WEBHOOK_ID:
+        threading.Thread(target=process, daemon=True).start()
+        cache.add_refresher_task(keep_alive)